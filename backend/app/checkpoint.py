@@ -0,0 +1,61 @@
+"""
+Checkpoints: the state needed to resume a workflow run after a restart.
+
+After every batch of steps that passes, the orchestrator saves a RunState:
+how many steps (in sorted order) are done, the context they produced, their
+StepRun records and the cost so far. Orchestrator.resume() picks up from
+there instead of re-running (and re-paying for) finished steps.
+
+For DAG workflows (Step.depends_on) a checkpoint is saved after every passed
+step, and resuming runs exactly the steps without a PASSED record.
+
+WHY a Protocol:
+The orchestrator stays free of I/O. InMemoryCheckpointStore survives a
+crashed task but not a crashed process; a store backed by Redis, SQLite or
+similar implements the same methods to survive restarts.
+
+A completed run is never resumed, so the orchestrator deletes its checkpoint;
+only failed (or interrupted) runs keep theirs.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+from uuid import UUID
+
+from .models import StepRun
+
+
+@dataclass(frozen=True)
+class RunState:
+    step_idx: int                       # Steps in sorted_steps[:step_idx] passed
+    context: str                        # Output of the last passed step
+    step_runs: dict[UUID, StepRun] = field(default_factory=dict)
+    total_cost_usd: float = 0.0
+    initial_context: str = ""           # Context for steps with no dependencies
+
+
+class CheckpointStore(Protocol):
+    async def save(self, run_id: UUID, state: RunState) -> None:
+        ...
+
+    async def load(self, run_id: UUID) -> Optional[RunState]:
+        ...
+
+    async def delete(self, run_id: UUID) -> None:
+        ...
+
+
+class InMemoryCheckpointStore:
+    """Keeps the latest RunState per run in a dict."""
+
+    def __init__(self):
+        self._states: dict[UUID, RunState] = {}
+
+    async def save(self, run_id: UUID, state: RunState) -> None:
+        self._states[run_id] = state
+
+    async def load(self, run_id: UUID) -> Optional[RunState]:
+        return self._states.get(run_id)
+
+    async def delete(self, run_id: UUID) -> None:
+        self._states.pop(run_id, None)
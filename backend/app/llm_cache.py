@@ -0,0 +1,64 @@
+"""
+Exact-match cache for LLM outputs.
+
+Keyed by SHA-256 of (model, system_prompt, final_prompt). An identical
+request — a rerun of the same workflow, or a test suite replaying a fixture —
+skips the LLM round trip and its token cost entirely.
+
+WHY only validated outputs are stored:
+The orchestrator calls the LLM with temperature > 0 and retries when
+validation fails. Caching every response would make a retry replay the exact
+output that was just rejected. Storing only outputs that passed keeps the
+retry loop meaningful and means a hit is an output we already accepted.
+
+WHY async get/set:
+The in-memory LRU doesn't need it, but a shared backend (Redis etc.) would.
+Keeping the interface async lets one be dropped in without touching the
+orchestrator.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+import orjson
+
+from .models import ModelName
+
+
+# Default number of outputs kept in memory
+DEFAULT_MAX_ENTRIES = 256
+
+
+class LLMCache:
+    """In-memory LRU of validated LLM outputs."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    @staticmethod
+    def make_key(model: ModelName, system_prompt: Optional[str], prompt: str) -> str:
+        payload = orjson.dumps(
+            {"model": model.value, "sys": system_prompt, "prompt": prompt},
+            option=orjson.OPT_SORT_KEYS,
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        content = self._entries.get(key)
+        if content is not None:
+            self._entries.move_to_end(key)
+        return content
+
+    async def set(self, key: str, content: str) -> None:
+        self._entries[key] = content
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,20 +1,33 @@
+import asyncio
+import logging
 import os
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
+from weakref import WeakKeyDictionary
 
 import httpx
+import orjson
 
-try:
-    from dotenv import load_dotenv
+from .models import ModelName
+from .orchestrator import ChunkCallback, LLMResponse
 
-    # Prefer a project-local .env in backend/.env regardless of CWD.
-    load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env", override=False)
-except Exception:
-    # Optional: env loading should never prevent the app from starting.
-    pass
 
-from .models import ModelName
-from .orchestrator import LLMResponse
+logger = logging.getLogger(__name__)
+
+
+def _load_env() -> None:
+    """Load backend/.env before the settings below are read."""
+    try:
+        from dotenv import load_dotenv
+
+        # Prefer a project-local .env in backend/.env regardless of CWD.
+        load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env", override=False)
+    except Exception:
+        # Optional: env loading should never prevent the app from starting.
+        pass
+
+
+_load_env()
 
 
 # =============================================================================
@@ -27,8 +40,39 @@ UNBOUND_API_URL = "https://api.getunbound.ai/v1/chat/completions"
 # Environment variable name for API key
 UNBOUND_API_KEY_ENV = "UNBOUND_API_KEY"
 
+# Resolved once at import instead of on every UnboundLLMClient()
+_UNBOUND_API_KEY = os.getenv(UNBOUND_API_KEY_ENV)
+
+# Set UNBOUND_REQUIRE_KEY=1 to fail at startup rather than on the first run
+if not _UNBOUND_API_KEY and os.getenv("UNBOUND_REQUIRE_KEY") == "1":
+    raise ValueError(
+        f"Unbound API key not provided. Set {UNBOUND_API_KEY_ENV} environment variable."
+    )
+
 DEFAULT_TIMEOUT = 60.0
 
+# Connecting should fail fast; only generation is allowed the full timeout
+CONNECT_TIMEOUT = 5.0
+
+# Connection pool sizing for the shared HTTP client
+# WHY keepalive == max: with HTTP/2 one connection multiplexes many calls,
+# so idle connections are cheap to keep and expensive to re-handshake.
+MAX_CONNECTIONS = 50
+MAX_KEEPALIVE_CONNECTIONS = 50
+KEEPALIVE_EXPIRY = 60.0
+
+# Transport-level retries for failed connection attempts (not HTTP errors)
+CONNECT_RETRIES = 3
+
+WARMUP_TIMEOUT = 5.0
+
+# Max in-flight requests to Unbound per process (sized to the account's RPM/TPM budget)
+MAX_CONCURRENCY = int(os.getenv("UNBOUND_MAX_CONCURRENCY", "8"))
+
+# Retries for HTTP 429, with exponential backoff unless Retry-After says otherwise
+MAX_RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF_BASE = 1.0
+
 # EXCEPTIONS
 
 class UnboundAPIError(Exception):
@@ -41,6 +85,100 @@ class UnboundAPIError(Exception):
         super().__init__(message)
 
 
+# SHARED HTTP CLIENT
+#
+# WHY module-level: Creating an AsyncClient per request pays a full TCP+TLS
+# handshake every call and throws away the HTTP/2 connection. One pooled
+# client per process lets concurrent steps reuse (and multiplex) connections.
+#
+# WHY one per event loop: pooled connections (and the semaphore below) belong
+# to the loop that opened them. Scripts and tests calling asyncio.run() more
+# than once would otherwise reuse sockets of a closed loop, or fail with
+# "bound to a different event loop". Entries go away with their loop.
+
+_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the running loop's shared AsyncClient, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        # http2/limits live on the transport so connection retries also use HTTP/2
+        client = _clients[loop] = httpx.AsyncClient(
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT),
+            follow_redirects=True,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=CONNECT_RETRIES,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+            ),
+        )
+    return client
+
+
+async def warm_up(api_url: str = UNBOUND_API_URL) -> Optional[str]:
+    """
+    Open the pooled connection ahead of the first LLM call and log its protocol.
+    
+    WHY: httpx silently falls back to HTTP/1.1 when the server (or a missing
+    `h2` package) doesn't negotiate HTTP/2, and then concurrent steps need
+    one connection each. The status code doesn't matter; only the handshake.
+    """
+    client = await get_client()
+    try:
+        response = await client.head(api_url, timeout=WARMUP_TIMEOUT)
+    except httpx.HTTPError as e:
+        logger.warning("Unbound warm-up failed (%s): %s", type(e).__name__, e)
+        return None
+    
+    if response.http_version == "HTTP/2":
+        logger.info("Unbound connection warmed up over HTTP/2")
+    else:
+        logger.warning(
+            "Unbound connection negotiated %s; requests will not be multiplexed",
+            response.http_version,
+        )
+    return response.http_version
+
+
+async def close_client() -> None:
+    """Close the running loop's shared AsyncClient (called on app shutdown)."""
+    loop = asyncio.get_running_loop()
+    client = _clients.pop(loop, None)
+    _semaphores.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+# Bounds concurrent LLM calls when steps/validations are fanned out with gather
+_semaphores: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+
+def _llm_semaphore() -> asyncio.Semaphore:
+    """Return the running loop's LLM concurrency semaphore."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return semaphore
+
+
+def _retry_after_seconds(response: httpx.Response, attempt: int) -> float:
+    """Delay before retrying a 429: honor Retry-After, else back off exponentially."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form is not worth parsing here
+    return RATE_LIMIT_BACKOFF_BASE * (2 ** attempt)
+
+
 # LLM CLIENT
 
 class UnboundLLMClient:
@@ -50,16 +188,30 @@ class UnboundLLMClient:
         api_key: Optional[str] = None,
         api_url: str = UNBOUND_API_URL,
         timeout: float = DEFAULT_TIMEOUT,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
-        self.api_key = api_key or os.getenv(UNBOUND_API_KEY_ENV)
+        """
+        Args:
+            http_client: Client to send requests with. Defaults to the shared
+                pool of the running loop (get_client()); pass one to isolate a pool.
+        """
+        self.api_key = api_key or _UNBOUND_API_KEY
         self.api_url = api_url
         self.timeout = timeout
+        self._timeout = httpx.Timeout(timeout, connect=CONNECT_TIMEOUT)
+        self._http_client = http_client
         
         if not self.api_key:
             raise ValueError(
                 f"Unbound API key not provided. "
                 f"Set {UNBOUND_API_KEY_ENV} environment variable or pass api_key parameter."
             )
+        
+        # Built once per client; reused by every call
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
     
     async def call(
         self,
@@ -68,72 +220,41 @@ class UnboundLLMClient:
         system_prompt: Optional[str] = None,
         temperature: float = 0.2,
         max_tokens: Optional[int] = None,
+        on_chunk: Optional[ChunkCallback] = None,
     ) -> LLMResponse:
-        messages = []
-        if system_prompt:
-            messages.append({
-                "role": "system",
-                "content": system_prompt,
-            })
+        request_body = self._request_body(model, prompt, system_prompt, temperature, max_tokens)
         
-        messages.append({
-            "role": "user",
-            "content": prompt,
-        })
-        
-        request_body = {
-            "model": model.value, 
-            "messages": messages,
-            "temperature": temperature,
-        }
-        
-        # Only include max_tokens if explicitly set
-        # WHY: Some models have their own defaults; omitting lets API decide
-        if max_tokens is not None:
-            request_body["max_tokens"] = max_tokens
+        # Streaming: deltas go to on_chunk as they arrive, full text is returned
+        if on_chunk is not None:
+            return await self._call_streaming(request_body, on_chunk)
         
         # SEND REQUEST
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        # Pre-encode with orjson instead of httpx's stdlib json.dumps (once, even on retries)
+        content = orjson.dumps(request_body)
+        client = self._http_client or await get_client()
         
-        try:
-            async with httpx.AsyncClient(
-                timeout=self.timeout,
-                http2=True,
-                follow_redirects=True,
-            ) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=headers,
-                    json=request_body,
-                )
-        except httpx.TimeoutException:
-            raise UnboundAPIError(
-                f"Request timed out after {self.timeout}s (url={self.api_url})",
-                status_code=None,
-            )
-        except httpx.RequestError as e:
-            detail = str(e) or repr(e)
-            raise UnboundAPIError(
-                f"Network error ({type(e).__name__}): {detail} (url={self.api_url})",
-                status_code=None,
-            )
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            try:
+                async with _llm_semaphore():
+                    # Timeout is per-request so each UnboundLLMClient keeps its own budget
+                    response = await client.post(
+                        self.api_url,
+                        headers=self._headers,
+                        content=content,
+                        timeout=self._timeout,
+                    )
+            except httpx.RequestError as e:
+                raise self._network_error(e)
+            
+            # Rate limited — wait outside the semaphore so other calls can proceed
+            if response.status_code == 429 and attempt < MAX_RATE_LIMIT_RETRIES:
+                await asyncio.sleep(_retry_after_seconds(response, attempt))
+                continue
+            break
         
         # HANDLE RESPONSE
         if response.status_code != 200:
-            # Try to extract error message from response body
-            try:
-                error_data = response.json()
-                error_msg = error_data.get("error", {}).get("message", response.text)
-            except Exception:
-                error_msg = response.text
-            
-            raise UnboundAPIError(
-                f"API error ({response.status_code}): {error_msg}",
-                status_code=response.status_code,
-            )
+            raise self._api_error(response)
         
         # PARSE RESPONSE
         # Expected format:
@@ -142,7 +263,7 @@ class UnboundLLMClient:
         #   "usage": {"prompt_tokens": 123, "completion_tokens": 456}
         # }
         try:
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Extract assistant message
             choices = data.get("choices", [])
@@ -168,6 +289,158 @@ class UnboundLLMClient:
             if isinstance(e, UnboundAPIError):
                 raise
             raise UnboundAPIError(f"Failed to parse response: {str(e)}")
+    
+    def stream(
+        self,
+        model: ModelName,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.2,
+        max_tokens: Optional[int] = None,
+        usage: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield content deltas as they arrive.
+        
+        Closing the iterator early (aclose()) closes the HTTP stream, so the
+        provider stops generating. Token usage arrives in the final frame and
+        is written into `usage` only if the stream is read to the end.
+        """
+        request_body = self._request_body(model, prompt, system_prompt, temperature, max_tokens)
+        return self._iter_stream(request_body, usage if usage is not None else {})
+    
+    @staticmethod
+    def _request_body(
+        model: ModelName,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+    ) -> dict:
+        if system_prompt:
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ]
+        else:
+            messages = [{"role": "user", "content": prompt}]
+        
+        request_body = {
+            "model": model.value, 
+            "messages": messages,
+            "temperature": temperature,
+        }
+        
+        # Only include max_tokens if explicitly set
+        # WHY: Some models have their own defaults; omitting lets API decide
+        if max_tokens is not None:
+            request_body["max_tokens"] = max_tokens
+        return request_body
+    
+    async def _call_streaming(
+        self,
+        request_body: dict,
+        on_chunk: ChunkCallback,
+    ) -> LLMResponse:
+        parts: list[str] = []
+        usage: dict = {}
+        async for delta in self._iter_stream(request_body, usage):
+            parts.append(delta)
+            on_chunk(delta)
+        
+        return LLMResponse(
+            content="".join(parts),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+    
+    async def _iter_stream(
+        self,
+        request_body: dict,
+        usage: dict,
+    ) -> AsyncIterator[str]:
+        """
+        Yield content deltas from a streamed (SSE) completion.
+        
+        Token usage, sent in the final frame, is written into `usage`.
+        Expected frames:
+            data: {"choices": [{"delta": {"content": "..."}}]}
+            data: {"choices": [], "usage": {"prompt_tokens": 1, ...}}
+            data: [DONE]
+        """
+        content = orjson.dumps({
+            **request_body,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        })
+        client = self._http_client or await get_client()
+        
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            retry_delay = None
+            try:
+                async with _llm_semaphore():
+                    async with client.stream(
+                        "POST",
+                        self.api_url,
+                        headers=self._headers,
+                        content=content,
+                        timeout=self._timeout,
+                    ) as response:
+                        if response.status_code == 429 and attempt < MAX_RATE_LIMIT_RETRIES:
+                            retry_delay = _retry_after_seconds(response, attempt)
+                        elif response.status_code != 200:
+                            await response.aread()
+                            raise self._api_error(response)
+                        else:
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue  # blank separators, SSE comments
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    return
+                                try:
+                                    frame = orjson.loads(data)
+                                except orjson.JSONDecodeError as e:
+                                    raise UnboundAPIError(f"Failed to parse stream frame: {e}")
+                                
+                                if frame.get("usage"):
+                                    usage.update(frame["usage"])
+                                choices = frame.get("choices") or []
+                                if choices:
+                                    delta = (choices[0].get("delta") or {}).get("content")
+                                    if delta:
+                                        yield delta
+                            return
+            except httpx.RequestError as e:
+                raise self._network_error(e)
+            
+            # Rate limited — wait outside the semaphore so other calls can proceed
+            await asyncio.sleep(retry_delay)
+    
+    def _network_error(self, e: httpx.RequestError) -> UnboundAPIError:
+        if isinstance(e, httpx.TimeoutException):
+            return UnboundAPIError(
+                f"Request timed out after {self.timeout}s (url={self.api_url})",
+                status_code=None,
+            )
+        detail = str(e) or repr(e)
+        return UnboundAPIError(
+            f"Network error ({type(e).__name__}): {detail} (url={self.api_url})",
+            status_code=None,
+        )
+    
+    def _api_error(self, response: httpx.Response) -> UnboundAPIError:
+        # Try to extract error message from response body
+        try:
+            error_data = orjson.loads(response.content)
+            error_msg = error_data.get("error", {}).get("message", response.text)
+        except Exception:
+            error_msg = response.text
+        
+        return UnboundAPIError(
+            f"API error ({response.status_code}): {error_msg}",
+            status_code=response.status_code,
+        )
 
 
 def create_unbound_client(
@@ -5,7 +5,7 @@ This module wires together:
 - REST API for workflow CRUD
 - WebSocket for real-time execution events
 - Orchestrator for workflow execution
-- In-memory storage for hackathon simplicity
+- In-memory storage for hackathon simplicity (runs live in a RunRegistry)
 
 ARCHITECTURE:
 ┌─────────────┐     ┌─────────────┐     ┌─────────────┐
@@ -18,12 +18,15 @@ ARCHITECTURE:
 """
 
 import asyncio
-from datetime import datetime
+from contextlib import asynccontextmanager
 from typing import Optional
 from uuid import UUID
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+import orjson
+from fastapi import FastAPI, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import ValidationError
 
 from .models import (
     ExecutionEvent,
@@ -35,26 +38,41 @@ from .models import (
     WorkflowCreate,
     WorkflowRun,
     WorkflowUpdate,
+    utc_now,
 )
 from .orchestrator import Orchestrator, create_orchestrator
-from .llm_client import create_unbound_client
+from .llm_client import close_client, create_unbound_client, warm_up
+from .registry import RunRegistry
 from .validators import ValidatorDispatcher
 
 
 workflows: dict[UUID, Workflow] = {}
-workflow_runs: dict[UUID, WorkflowRun] = {}
 
-websocket_connections: dict[UUID, list[WebSocket]] = {}
+# Serialized JSON per workflow, refreshed on every write
+# WHY: Workflows change rarely but are fetched/exported often
+_workflow_json_cache: dict[UUID, bytes] = {}
 
-# Buffer events until WebSocket connects
-pending_events: dict[UUID, list[ExecutionEvent]] = {}
+# Runs, buffered events (until WebSocket connects) and live connections
+registry = RunRegistry()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    janitor = asyncio.create_task(registry.evict_loop())
+    # Background so startup isn't blocked on the upstream handshake
+    warmup = asyncio.create_task(warm_up())
+    yield
+    janitor.cancel()
+    warmup.cancel()
+    # Release pooled upstream connections held by the shared LLM HTTP client
+    await close_client()
+
 
 app = FastAPI(
     title="Agentic Workflow Builder",
     description="API for creating and executing multi-step LLM workflows",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -65,37 +83,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Large JSON (exports, run lists) compresses well; tiny responses aren't worth it.
+# WebSocket frames use permessage-deflate, negotiated by uvicorn by default.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring."""
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    return {"status": "healthy", "timestamp": utc_now().isoformat()}
+
+
+
+def _store_workflow(workflow: Workflow) -> None:
+    """Save a workflow and refresh its cached JSON."""
+    workflows[workflow.id] = workflow
+    _workflow_json_cache[workflow.id] = workflow.model_dump_json().encode()
+
 
+def _build_workflow(**fields) -> Workflow:
+    """
+    Construct a Workflow from request data, mapping model errors to 422.
+    
+    WHY: Checks that span steps (depends_on ids, cycles) run when the Workflow
+    is built inside the handler, after FastAPI's own request validation;
+    uncaught they would surface as a 500.
+    """
+    try:
+        return Workflow(**fields)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=e.errors(include_url=False, include_context=False, include_input=False),
+        )
 
 
 @app.post("/workflows", response_model=Workflow)
 async def create_workflow(request: WorkflowCreate) -> Workflow:
-    workflow = Workflow(
+    workflow = _build_workflow(
         name=request.name,
         description=request.description,
         steps=request.steps,
         webhook_url=request.webhook_url,
     )
-    workflows[workflow.id] = workflow
+    _store_workflow(workflow)
     return workflow
 
 
 @app.get("/workflows", response_model=list[Workflow])
-async def list_workflows() -> list[Workflow]:
-    return list(workflows.values())
+async def list_workflows() -> Response:
+    # Join cached encodings; skips re-validating every workflow per poll
+    return Response(
+        content=b"[" + b",".join(_workflow_json_cache.values()) + b"]",
+        media_type="application/json",
+    )
 
 
 @app.get("/workflows/{workflow_id}", response_model=Workflow)
-async def get_workflow(workflow_id: UUID) -> Workflow:
+async def get_workflow(workflow_id: UUID) -> Response:
     if workflow_id not in workflows:
         raise HTTPException(status_code=404, detail="Workflow not found")
-    return workflows[workflow_id]
+    return Response(content=_workflow_json_cache[workflow_id], media_type="application/json")
 
 
 @app.put("/workflows/{workflow_id}", response_model=Workflow)
@@ -105,10 +154,11 @@ async def update_workflow(workflow_id: UUID, request: WorkflowUpdate) -> Workflo
     
     workflow = workflows[workflow_id]
     update_data = request.model_dump(exclude_unset=True)
-    update_data["updated_at"] = datetime.utcnow()
+    update_data["updated_at"] = utc_now()
     
-    updated_workflow = workflow.model_copy(update=update_data)
-    workflows[workflow_id] = updated_workflow
+    # Rebuild (not model_copy) so the workflow's execution plan is recomputed
+    updated_workflow = _build_workflow(**{**dict(workflow), **update_data})
+    _store_workflow(updated_workflow)
     
     return updated_workflow
 
@@ -119,6 +169,7 @@ async def delete_workflow(workflow_id: UUID):
     if workflow_id not in workflows:
         raise HTTPException(status_code=404, detail="Workflow not found")
     del workflows[workflow_id]
+    _workflow_json_cache.pop(workflow_id, None)
     return {"status": "deleted"}
 
 
@@ -135,11 +186,8 @@ async def run_workflow(workflow_id: UUID, request: RunWorkflowRequest) -> RunWor
         status=RunStatus.PENDING,
         context=request.initial_context,
     )
-    workflow_runs[run.id] = run
-    websocket_connections[run.id] = []
-    
-    # Store pending events until WebSocket connects
-    pending_events[run.id] = []
+    # Also starts buffering events until a WebSocket connects
+    registry.add(run)
     
     asyncio.create_task(execute_workflow_background(workflow, run, request.initial_context))
     
@@ -156,39 +204,43 @@ async def execute_workflow_background(
 ) -> None:
     
     async def broadcast_event(event: ExecutionEvent) -> None:
-        connections = websocket_connections.get(run.id, [])
-        
-        # If no WebSocket connected yet, buffer the event
-        if not connections and run.id in pending_events:
-            pending_events[run.id].append(event)
-            return
-        
-        disconnected = []
-        for ws in connections:
-            try:
-                await ws.send_json(event.model_dump(mode="json"))
-            except Exception:
-                disconnected.append(ws)
-        
-        for ws in disconnected:
-            if ws in websocket_connections.get(run.id, []):
-                websocket_connections[run.id].remove(ws)
+        # Lock so a WebSocket connecting mid-broadcast can't reorder/drop events;
+        # per run, so a slow client here doesn't stall other runs
+        async with registry.locks[run.id]:
+            connections = registry.conns.get(run.id)
+            
+            # If no WebSocket connected yet, buffer the event
+            if not connections:
+                if run.id in registry.pending:
+                    registry.pending[run.id].append(event)
+                return
+            
+            # Serialize once (single pass in pydantic-core) for all subscribers
+            message = event.model_dump_json()
+            
+            # Send to all subscribers concurrently; failed sends mark dead sockets
+            targets = list(connections)
+            results = await asyncio.gather(
+                *(ws.send_text(message) for ws in targets),
+                return_exceptions=True,
+            )
+            connections.difference_update(
+                ws for ws, result in zip(targets, results) if isinstance(result, Exception)
+            )
     
     # Small delay to allow WebSocket to connect
     await asyncio.sleep(0.5)
 
     # Move run into RUNNING state immediately so /runs/{id} updates while executing.
     run.status = RunStatus.RUNNING
-    run.started_at = datetime.utcnow()
-    workflow_runs[run.id] = run
+    run.started_at = utc_now()
     
     try:
         llm_client = create_unbound_client()
     except ValueError as e:
         run.status = RunStatus.FAILED
         run.failure_reason = str(e)
-        run.finished_at = datetime.utcnow()
-        workflow_runs[run.id] = run
+        run.finished_at = utc_now()
 
         # Emit an explicit failure event so clients relying on WS see it.
         await broadcast_event(
@@ -198,31 +250,32 @@ async def execute_workflow_background(
                 payload={"reason": str(e)},
             )
         )
+        registry.mark_finished(run.id)
         return
     
     validator = ValidatorDispatcher()
     
-    def on_event(event: ExecutionEvent) -> None:
-        asyncio.create_task(broadcast_event(event))
-    
+    # Async on_event: the orchestrator queues events and sends them from a
+    # single background consumer, strictly in emission order, and waits for
+    # the queue to drain before run() returns.
     orchestrator = Orchestrator(
         llm_client=llm_client,
         validator=validator,
-        on_event=on_event,
+        on_event=broadcast_event,
+        parallel_steps=True,
+        stream_output=True,
     )
     
     try:
-        completed_run = await orchestrator.run(workflow, initial_context, run_id=run.id)
-        
-        # Update stored run with results
-        workflow_runs[run.id] = completed_run
-        
+        # Updates the registered run in place, so /runs/{id} shows live progress
+        await orchestrator.run(workflow, initial_context, run=run)
     except Exception as e:
         # Unexpected error — mark as failed
         run.status = RunStatus.FAILED
         run.failure_reason = f"Unexpected error: {str(e)}"
-        run.finished_at = datetime.utcnow()
-        workflow_runs[run.id] = run
+        run.finished_at = utc_now()
+    
+    registry.mark_finished(run.id)
 
 
 # =============================================================================
@@ -232,78 +285,99 @@ async def execute_workflow_background(
 @app.get("/runs/{run_id}", response_model=WorkflowRun)
 async def get_run(run_id: UUID) -> WorkflowRun:
     """Get the current status of a workflow run."""
-    if run_id not in workflow_runs:
+    if run_id not in registry.runs:
         raise HTTPException(status_code=404, detail="Run not found")
-    return workflow_runs[run_id]
+    return registry.runs[run_id]
 
 
 @app.get("/runs", response_model=list[WorkflowRun])
-async def list_runs() -> list[WorkflowRun]:
+async def list_runs() -> Response:
     """List all workflow runs."""
-    return list(workflow_runs.values())
+    # Serialize directly rather than re-validating via response_model.
+    # Not cached: in-flight runs are mutated in place as steps complete.
+    return Response(
+        content="[" + ",".join(run.model_dump_json() for run in registry.runs.values()) + "]",
+        media_type="application/json",
+    )
 
 
 # =============================================================================
 # WEBSOCKET FOR LIVE EVENTS
 # =============================================================================
 
+async def _send_json(websocket: WebSocket, data: dict) -> None:
+    """Send a control message as a JSON text frame (orjson, not stdlib json)."""
+    await websocket.send_text(orjson.dumps(data).decode())
+
+
 @app.websocket("/runs/{run_id}/events")
 async def websocket_events(websocket: WebSocket, run_id: UUID):
     await websocket.accept()
-    if run_id not in workflow_runs:
-        await websocket.send_json({"error": "Run not found"})
+    if run_id not in registry.runs:
+        await _send_json(websocket, {"error": "Run not found"})
         await websocket.close()
         return
     
-    if run_id not in websocket_connections:
-        websocket_connections[run_id] = []
-    websocket_connections[run_id].append(websocket)
-    
-    # Send any pending/buffered events
-    if run_id in pending_events:
-        for event in pending_events[run_id]:
-            try:
-                await websocket.send_json(event.model_dump(mode="json"))
-            except Exception:
-                pass
-        pending_events[run_id] = []  # Clear after sending
+    # Register and flush under the run's lock so no live event overtakes the buffer
+    async with registry.locks[run_id]:
+        registry.conns[run_id].add(websocket)
+        
+        # Send any pending/buffered events as ONE frame (a JSON array)
+        # WHY: A run may buffer hundreds of events before the client connects
+        if run_id in registry.pending:
+            buffered = registry.pending[run_id]
+            if buffered:
+                try:
+                    await websocket.send_text(
+                        "[" + ",".join(event.model_dump_json() for event in buffered) + "]"
+                    )
+                except Exception:
+                    pass
+            registry.pending[run_id] = []  # Clear after sending
     
-    run = workflow_runs[run_id]
-    await websocket.send_json({
+    run = registry.runs[run_id]
+    await _send_json(websocket, {
         "event_type": "connected",
         "run_id": str(run_id),
         "status": run.status.value,
         "payload": {},
     })
     
+    # Wake on either a client message or the run finishing — no polling timer
+    run_done = asyncio.create_task(registry.done[run_id].wait())
+    receive: Optional[asyncio.Task] = None
     try:
         while True:
-            try:
-                message = await asyncio.wait_for(
-                    websocket.receive_text(),
-                    timeout=30.0,  
-                )
+            receive = asyncio.create_task(websocket.receive_text())
+            await asyncio.wait({receive, run_done}, return_when=asyncio.FIRST_COMPLETED)
+            
+            if receive.done():
+                message = receive.result()  # Raises WebSocketDisconnect
                 if message == "ping":
                     await websocket.send_text("pong")
-            except asyncio.TimeoutError:
-                run = workflow_runs.get(run_id)
-                if run and run.status in [RunStatus.COMPLETED, RunStatus.FAILED]:
-                    # Send final status and close
-                    await websocket.send_json({
-                        "type": "run_ended",
-                        "status": run.status.value,
-                        "final_output": run.final_output,
-                        "failure_reason": run.failure_reason,
-                    })
-                    break
+                if not run_done.done():
+                    continue
+            
+            # Send final status and close
+            run = registry.runs.get(run_id, run)
+            await _send_json(websocket, {
+                "type": "run_ended",
+                "status": run.status.value,
+                "final_output": run.final_output,
+                "failure_reason": run.failure_reason,
+            })
+            break
                     
     except WebSocketDisconnect:
         pass
     finally:
+        run_done.cancel()
+        if receive is not None:
+            receive.cancel()
         # Unregister connection
-        if run_id in websocket_connections:
-            if websocket in websocket_connections[run_id]:
-                websocket_connections[run_id].remove(websocket)
+        async with registry.locks[run_id]:
+            if run_id in registry.conns:
+                registry.conns[run_id].discard(websocket)
 
 
 
@@ -313,8 +387,7 @@ async def export_workflow(workflow_id: UUID):
     if workflow_id not in workflows:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    workflow = workflows[workflow_id]
-    return workflow.model_dump(mode="json")
+    return Response(content=_workflow_json_cache[workflow_id], media_type="application/json")
 
 
 @app.post("/workflows/import", response_model=Workflow)
@@ -327,7 +400,7 @@ async def import_workflow(workflow_data: dict):
             steps=workflow_data.get("steps", []),
             webhook_url=workflow_data.get("webhook_url"),
         )
-        workflows[workflow.id] = workflow
+        _store_workflow(workflow)
         return workflow
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid workflow data: {e}")
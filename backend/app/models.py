@@ -14,12 +14,38 @@ Design principles:
 4. Models are JSON-serializable for easy WebSocket/export
 """
 
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
 from enum import Enum
+from functools import lru_cache
 from typing import Any, Optional
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+
+def utc_now() -> datetime:
+    """Current time as an aware UTC datetime (datetime.utcnow() is deprecated and naive)."""
+    return datetime.now(timezone.utc)
+
+
+# Placeholder in Step.prompt replaced with the previous step's output
+CONTEXT_PLACEHOLDER = "{{context}}"
+
+# Distinct prompt templates kept pre-split
+PROMPT_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _split_prompt(prompt: str) -> tuple[str, ...]:
+    """
+    `prompt` split on {{context}}, so rendering is a single str.join.
+
+    WHY keyed on the prompt (not stored on the Step): model_copy(update=...)
+    doesn't rerun validators, so a per-instance copy would go stale.
+    """
+    return tuple(prompt.split(CONTEXT_PLACEHOLDER))
+
 
 # ENUMS — Explicit states prevent typos and enable IDE autocomplete
 
@@ -136,10 +162,25 @@ class Step(BaseModel):
     system_prompt: Optional[str] = None # Optional system message
     validations: list[ValidationRule] = Field(default_factory=list)
     max_retries: int = Field(default=2, ge=0, le=5)  # Cap at 5 to prevent runaway
+    # Steps whose outputs form this step's {{context}}. None = the previous
+    # step by order (linear workflow); [] = the run's initial context.
+    depends_on: Optional[list[UUID]] = None
 
     class Config:
         frozen = True
 
+    @property
+    def reads_context(self) -> bool:
+        """True if the prompt contains {{context}}."""
+        return len(_split_prompt(self.prompt)) > 1
+
+    def render_prompt(self, context: str) -> str:
+        """Return the prompt with every {{context}} replaced by `context`."""
+        parts = _split_prompt(self.prompt)
+        if len(parts) == 1:
+            return self.prompt  # No placeholder: nothing to splice
+        return context.join(parts)
+
 
 
 # WORKFLOW — A sequence of steps
@@ -157,14 +198,100 @@ class Workflow(BaseModel):
     - `webhook_url` (optional) for completion notifications
     
     The workflow is a TEMPLATE — executing it creates a WorkflowRun.
+    
+    If any step sets `depends_on`, the workflow is a DAG: a step runs once
+    all of its dependencies passed, independent branches run concurrently,
+    and steps without `depends_on` depend on the previous step by order.
+    
+    The execution plan (step order, which steps read {{context}},
+    dependencies) is derived once at validation time rather than on every run. Build updated
+    workflows through the constructor, not model_copy(update=...), so the
+    plan is recomputed.
     """
     id: UUID = Field(default_factory=uuid4)
     name: str
     description: Optional[str] = None
     steps: list[Step] = Field(default_factory=list)
     webhook_url: Optional[str] = None   # Called on completion/failure
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
+
+    _sorted_steps: tuple[Step, ...] = PrivateAttr(default=())
+    _context_dependent_mask: int = PrivateAttr(default=0)
+    _dependencies: dict[UUID, tuple[UUID, ...]] = PrivateAttr(default_factory=dict)
+    _dependents: dict[UUID, tuple[UUID, ...]] = PrivateAttr(default_factory=dict)
+    _is_dag: bool = PrivateAttr(default=False)
+
+    @model_validator(mode="after")
+    def _build_plan(self) -> "Workflow":
+        self._sorted_steps = tuple(sorted(self.steps, key=lambda s: s.order))
+        mask = 0
+        for i, step in enumerate(self._sorted_steps):
+            if step.reads_context:
+                mask |= 1 << i
+        self._context_dependent_mask = mask
+        self._build_graph()
+        return self
+
+    def _build_graph(self) -> None:
+        steps = self._sorted_steps
+        ids = {step.id for step in steps}
+        dependencies: dict[UUID, tuple[UUID, ...]] = {}
+        dependents: dict[UUID, list[UUID]] = {step.id: [] for step in steps}
+        for i, step in enumerate(steps):
+            if step.depends_on is None:
+                deps = (steps[i - 1].id,) if i else ()
+            else:
+                deps = tuple(dict.fromkeys(step.depends_on))  # Dedupe, keep order
+                unknown = [d for d in deps if d not in ids or d == step.id]
+                if unknown:
+                    raise ValueError(f"Step '{step.name}' has invalid depends_on: {unknown}")
+            dependencies[step.id] = deps
+            for dep in deps:
+                dependents[dep].append(step.id)
+
+        # Kahn's algorithm: every step must become ready, or there's a cycle
+        remaining = {step_id: len(deps) for step_id, deps in dependencies.items()}
+        ready = [step_id for step_id, n in remaining.items() if n == 0]
+        visited = 0
+        while ready:
+            step_id = ready.pop()
+            visited += 1
+            for dependent in dependents[step_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if visited != len(steps):
+            raise ValueError("Step depends_on contains a cycle")
+
+        self._dependencies = dependencies
+        self._dependents = {step_id: tuple(d) for step_id, d in dependents.items()}
+        self._is_dag = any(step.depends_on is not None for step in steps)
+
+    @property
+    def sorted_steps(self) -> tuple[Step, ...]:
+        """Steps in execution order (by Step.order)."""
+        return self._sorted_steps
+
+    @property
+    def context_dependent_mask(self) -> int:
+        """Bit i is set when sorted_steps[i] references {{context}}."""
+        return self._context_dependent_mask
+
+    @property
+    def is_dag(self) -> bool:
+        """True if any step declares depends_on."""
+        return self._is_dag
+
+    @property
+    def dependencies(self) -> dict[UUID, tuple[UUID, ...]]:
+        """Step id -> ids of the steps it waits for (in context order)."""
+        return self._dependencies
+
+    @property
+    def dependents(self) -> dict[UUID, tuple[UUID, ...]]:
+        """Step id -> ids of the steps waiting for it."""
+        return self._dependents
 
 
 
@@ -183,7 +310,8 @@ class StepRun(BaseModel):
     - `cost` is approximate token-based cost (for tracking)
     - `error` captures failure reason if status == FAILED
     
-    Multiple StepRun records may exist for one step (one per retry attempt).
+    One record per step; it is reset on each retry, so `attempt` and the
+    other fields describe the last attempt.
     """
     id: UUID = Field(default_factory=uuid4)
     step_id: UUID
@@ -234,6 +362,18 @@ class WorkflowRun(BaseModel):
 
 # EXECUTION EVENT — WebSocket message payload
 
+# Event timestamps = one wall-clock anchor + monotonic offset.
+# WHY: Wall-clock reads can jump (NTP steps), which reorders a run's
+# events by timestamp; the monotonic clock never goes backwards.
+_WALL_CLOCK_BASE = utc_now()
+_MONOTONIC_BASE_NS = time.monotonic_ns()
+
+
+def _event_timestamp() -> datetime:
+    elapsed_us = (time.monotonic_ns() - _MONOTONIC_BASE_NS) // 1000
+    return _WALL_CLOCK_BASE + timedelta(microseconds=elapsed_us)
+
+
 class ExecutionEvent(BaseModel):
     """
     Event emitted to WebSocket during workflow execution.
@@ -242,7 +382,7 @@ class ExecutionEvent(BaseModel):
     - `event` is the discriminator (frontend switches on this)
     - `run_id` + `step_id` identify context
     - `attempt` shows which retry this is
-    - `timestamp` enables timeline reconstruction
+    - `timestamp` enables timeline reconstruction (monotonic within a process)
     - `payload` is flexible (dict) for event-specific data
     
     Examples:
@@ -256,15 +396,13 @@ class ExecutionEvent(BaseModel):
     run_id: UUID
     step_id: Optional[UUID] = None
     attempt: int = 1
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_event_timestamp)
     payload: dict[str, Any] = Field(default_factory=dict)
 
     class Config:
-        # Allow UUID serialization to string for JSON
-        json_encoders = {
-            UUID: str,
-            datetime: lambda v: v.isoformat()
-        }
+        # Events are never mutated after emission.
+        # UUID/datetime need no json_encoders: Pydantic v2 serializes them natively.
+        frozen = True
 
 
 # API REQUEST/RESPONSE MODELS — For FastAPI endpoints
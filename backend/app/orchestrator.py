@@ -2,7 +2,9 @@
 Orchestrator: The core execution engine for workflows.
 
 This module is responsible for:
-1. Executing workflow steps sequentially (by Step.order)
+1. Executing workflow steps sequentially (by Step.order), optionally running
+   steps that don't read {{context}} concurrently with their predecessor,
+   or as a dependency graph when steps declare depends_on
 2. Managing retries per step
 3. Accumulating context between steps
 4. Emitting events for real-time UI updates
@@ -20,11 +22,17 @@ WHY THIS STRUCTURE:
 - Extensible: swap LLM provider or add validators without touching core logic
 """
 
+import asyncio
+import inspect
+import logging
+import time
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Callable, Optional, Protocol
-from uuid import UUID
+from types import MappingProxyType
+from typing import AsyncIterator, Awaitable, Callable, Optional, Protocol, Sequence, Union
+from uuid import UUID, uuid4
 
+from .checkpoint import CheckpointStore, RunState
+from .llm_cache import LLMCache
 from .models import (
     EventType,
     ExecutionEvent,
@@ -34,10 +42,15 @@ from .models import (
     StepRun,
     StepStatus,
     ValidationRule,
+    ValidationType,
     Workflow,
     WorkflowRun,
+    utc_now,
 )
 
+logger = logging.getLogger(__name__)
+
+
 @dataclass
 class LLMResponse:
     content: str
@@ -45,12 +58,17 @@ class LLMResponse:
     completion_tokens: int = 0
 
 
+# Receives each streamed content delta as it arrives
+ChunkCallback = Callable[[str], None]
+
+
 class LLMClient(Protocol):
     async def call(
         self,
         model: ModelName,
         prompt: str,
         system_prompt: Optional[str] = None,
+        on_chunk: Optional[ChunkCallback] = None,  # Only passed when streaming
     ) -> LLMResponse:
         ...
 
@@ -71,7 +89,58 @@ class Validator(Protocol):
         ...
 
 
-EventCallback = Callable[[ExecutionEvent], None]
+EventCallback = Union[
+    Callable[[ExecutionEvent], None],
+    Callable[[ExecutionEvent], Awaitable[None]],  # Runs off the critical path
+]
+
+# Steps with at least this many LLM_JUDGE rules run them concurrently (asyncio.gather)
+PARALLEL_VALIDATION_THRESHOLD = 2
+
+# Relative cost of each validation type; cheaper rules run first.
+# Rules at or above REMOTE_RULE_COST make network calls.
+_RULE_COST = {
+    ValidationType.CONTAINS: 0,
+    ValidationType.REGEX_MATCH: 0,
+    ValidationType.JSON_VALID: 1,
+    ValidationType.PYTHON_SYNTAX: 1,
+    ValidationType.TEST_EXEC: 2,
+    ValidationType.LLM_JUDGE: 10,
+}
+REMOTE_RULE_COST = 10
+
+# USD per token as (prompt, completion); listed per 1K tokens for readability
+_RATES_PER_TOKEN = MappingProxyType({
+    ModelName.KIMI_K2_INSTRUCT: (0.001 / 1000, 0.002 / 1000),
+    ModelName.KIMI_K2P5: (0.002 / 1000, 0.004 / 1000),
+})
+_DEFAULT_RATES_PER_TOKEN = (0.001 / 1000, 0.002 / 1000)
+
+# Event payloads carry at most this much of a step's output
+OUTPUT_PREVIEW_CHARS = 500
+
+# Max events waiting for an async on_event; beyond this new events are dropped,
+# except _LOSSLESS_EVENTS
+EVENT_QUEUE_SIZE = 1024
+
+# Step/run outcomes: always queued, even past EVENT_QUEUE_SIZE. At most a few
+# per step, so they can't grow the queue without bound; a client that missed
+# them would show a run that never finishes.
+_LOSSLESS_EVENTS = frozenset({
+    EventType.STEP_COMPLETED,
+    EventType.STEP_FAILED,
+    EventType.RUN_COMPLETED,
+    EventType.RUN_FAILED,
+})
+
+# Joins the outputs of several depends_on steps into one {{context}}
+DAG_CONTEXT_SEPARATOR = "\n\n"
+
+# Default number of workflows run_many executes at once
+RUN_MANY_CONCURRENCY = 10
+
+# Streamed deltas are coalesced into one LLM_CHUNK event per interval (seconds)
+CHUNK_FLUSH_INTERVAL = 0.016
 
 
 # =============================================================================
@@ -84,10 +153,14 @@ class StubLLMClient:
         model: ModelName,
         prompt: str,
         system_prompt: Optional[str] = None,
+        on_chunk: Optional[ChunkCallback] = None,
     ) -> LLMResponse:
         # Simulate a simple response
+        content = f"[STUB] Response to: {prompt[:50]}..."
+        if on_chunk is not None:
+            on_chunk(content)
         return LLMResponse(
-            content=f"[STUB] Response to: {prompt[:50]}...",
+            content=content,
             prompt_tokens=len(prompt.split()),
             completion_tokens=10,
         )
@@ -110,10 +183,44 @@ class StubValidator:
         return ValidationResult(passed=True)
 
 
+class _ChunkCoalescer:
+    """
+    Buffers streamed LLM deltas and flushes them at most every CHUNK_FLUSH_INTERVAL.
+    
+    WHY: One WebSocket send per token would dominate a streaming run;
+    ~60 flushes/sec is smooth for the UI and far fewer events.
+    """
+    
+    def __init__(self, flush: Callable[[str], None]):
+        self._flush = flush
+        self._parts: list[str] = []
+        self._last_flush = time.monotonic()
+    
+    def __call__(self, delta: str) -> None:
+        self._parts.append(delta)
+        now = time.monotonic()
+        if now - self._last_flush >= CHUNK_FLUSH_INTERVAL:
+            self.flush(now)
+    
+    def flush(self, now: Optional[float] = None) -> None:
+        if self._parts:
+            self._flush("".join(self._parts))
+            self._parts.clear()
+        self._last_flush = now if now is not None else time.monotonic()
+
+
 # =============================================================================
 # ORCHESTRATOR — Main execution engine
 # =============================================================================
 
+def _satisfiable_by_prefix(step: Step) -> bool:
+    """True if every rule is a CONTAINS check, which a prefix of the output can settle."""
+    return bool(step.validations) and all(
+        rule.type == ValidationType.CONTAINS and rule.expected is not None
+        for rule in step.validations
+    )
+
+
 class Orchestrator:
     """
     Executes workflows step-by-step with retry logic.
@@ -128,6 +235,42 @@ class Orchestrator:
        e. If any fail → retry up to max_retries
        f. If retries exhausted → fail workflow
     3. Emit events at each significant point
+    
+    With parallel_steps=True, a step whose prompt doesn't reference
+    {{context}} is started alongside the step before it (asyncio.gather),
+    since it can't observe that step's output anyway.
+    
+    With stream_output=True, the LLM client streams and partial output is
+    emitted as coalesced LLM_CHUNK events before LLM_OUTPUT.
+    
+    With speculative=True, while a step runs, the first LLM call of the next
+    step is already sent if that step doesn't reference {{context}} (its
+    prompt can't change). If the current step fails the prefetch is cancelled;
+    any tokens it already used are wasted, but the latency is hidden.
+    Validation still happens in order, so only the call is speculative.
+    
+    With early_stop=True, a step whose only rules are CONTAINS is streamed
+    and the stream is closed as soon as every expected substring has
+    appeared. A substring match can't be undone by more text, so the step is
+    guaranteed to pass. The step's output (and the next step's context) is
+    the text up to that point. Requires an LLM client with stream().
+    
+    An async `on_event` (e.g. a WebSocket send) is not awaited inline:
+    events go into a bounded queue drained by a background task, so a slow
+    sink never stalls a step. Each run()/resume() waits for the queue to
+    drain before returning. If event_queue_size events are already waiting,
+    the event is dropped and counted in dropped_events, unless it's a step
+    or run outcome (_LOSSLESS_EVENTS), which is always delivered.
+    
+    Workflows whose steps declare depends_on run as a DAG instead (see
+    _run_dag); parallel_steps and speculative don't apply there.
+    
+    With a `checkpoint` store, the run's progress is saved after every batch
+    that passes, and resume() continues a run from its last checkpoint.
+    
+    With a `cache`, a step whose (model, system_prompt, prompt) produced a
+    validated output before reuses it instead of calling the LLM.
+    cache_hits/cache_misses count lookups.
     """
     
     def __init__(
@@ -135,10 +278,38 @@ class Orchestrator:
         llm_client: LLMClient,
         validator: Validator,
         on_event: Optional[EventCallback] = None,
+        parallel_steps: bool = False,
+        stream_output: bool = False,
+        cache: Optional[LLMCache] = None,
+        speculative: bool = False,
+        early_stop: bool = False,
+        checkpoint: Optional[CheckpointStore] = None,
+        event_queue_size: int = EVENT_QUEUE_SIZE,
     ):
         self.llm_client = llm_client
         self.validator = validator
+        # Validators that check a whole rule list at once (ValidatorDispatcher)
+        self._validate_many: Optional[
+            Callable[..., Awaitable[list[Optional[ValidationResult]]]]
+        ] = getattr(validator, "validate_many", None)
         self.on_event = on_event or (lambda e: None)  # No-op if not provided
+        # Without a listener, events (and streamed chunks) aren't built at all
+        self._events_enabled = on_event is not None
+        self.event_queue_size = event_queue_size
+        self.dropped_events = 0
+        # Async sink state; the queue and drain task exist while runs are active
+        self._async_sink = inspect.iscoroutinefunction(on_event)
+        self._event_queue: Optional[asyncio.Queue] = None
+        self._drain_task: Optional[asyncio.Task] = None
+        self._active_runs = 0
+        self.parallel_steps = parallel_steps
+        self.stream_output = stream_output
+        self.cache = cache
+        self.speculative = speculative
+        self.early_stop = early_stop
+        self.checkpoint = checkpoint
+        self.cache_hits = 0
+        self.cache_misses = 0
     
     def _emit(
         self,
@@ -148,35 +319,274 @@ class Orchestrator:
         attempt: int = 1,
         payload: Optional[dict] = None,
     ) -> None:
-        event = ExecutionEvent(
+        if not self._events_enabled:
+            return
+        # WHY model_construct: every field comes from already-validated objects,
+        # so revalidating each of the ~5 events per step is wasted work.
+        event = ExecutionEvent.model_construct(
             event=event_type,
             run_id=run.id,
             step_id=step.id if step else None,
             attempt=attempt,
             payload=payload or {},
         )
-        self.on_event(event)
+        if self._event_queue is None:
+            self.on_event(event)
+            return
+        # The queue itself is unbounded so outcomes always fit; the bound
+        # applies to everything else (mostly LLM_CHUNK)
+        if self._event_queue.qsize() >= self.event_queue_size and event_type not in _LOSSLESS_EVENTS:
+            self.dropped_events += 1
+            logger.warning("Event queue full; dropped %s for run %s", event_type.value, run.id)
+            return
+        self._event_queue.put_nowait(event)
+    
+    def _open_sink(self) -> None:
+        """Start the event queue + drain task for an async on_event (shared by concurrent runs)."""
+        self._active_runs += 1
+        if self._async_sink and self._event_queue is None:
+            self._event_queue = asyncio.Queue()
+            self._drain_task = asyncio.create_task(self._drain_events(self._event_queue))
+    
+    async def _close_sink(self) -> None:
+        """Wait until every queued event is delivered; stop draining after the last run."""
+        self._active_runs -= 1
+        queue = self._event_queue
+        if queue is None:
+            return
+        await queue.join()
+        if self._active_runs == 0 and self._event_queue is queue:
+            self._event_queue = None
+            self._drain_task.cancel()
+            self._drain_task = None
+    
+    async def _drain_events(self, queue: asyncio.Queue) -> None:
+        while True:
+            event = await queue.get()
+            try:
+                await self.on_event(event)
+            except Exception:
+                logger.exception("on_event failed for %s", event.event.value)
+            finally:
+                queue.task_done()
     
     def _build_prompt(self, step: Step, context: str) -> str:
-        return step.prompt.replace("{{context}}", context)
+        return step.render_prompt(context)
+    
+    async def _call_llm(
+        self,
+        step: Step,
+        run: WorkflowRun,
+        attempt: int,
+        prompt: str,
+    ) -> LLMResponse:
+        if self.early_stop and _satisfiable_by_prefix(step):
+            stream = getattr(self.llm_client, "stream", None)
+            if stream is not None:
+                return await self._stream_until_satisfied(step, run, attempt, prompt, stream)
+        
+        if not (self.stream_output and self._events_enabled):
+            return await self.llm_client.call(
+                model=step.model,
+                prompt=prompt,
+                system_prompt=step.system_prompt,
+            )
+        
+        coalescer = _ChunkCoalescer(
+            lambda text: self._emit(EventType.LLM_CHUNK, run, step, attempt, {"delta": text})
+        )
+        response = await self.llm_client.call(
+            model=step.model,
+            prompt=prompt,
+            system_prompt=step.system_prompt,
+            on_chunk=coalescer,
+        )
+        coalescer.flush()  # Emit whatever arrived after the last interval
+        return response
+    
+    async def _stream_until_satisfied(
+        self,
+        step: Step,
+        run: WorkflowRun,
+        attempt: int,
+        prompt: str,
+        stream: Callable[..., AsyncIterator[str]],
+    ) -> LLMResponse:
+        """Stream the completion, stopping once every CONTAINS rule is satisfied."""
+        coalescer = None
+        if self.stream_output and self._events_enabled:
+            coalescer = _ChunkCoalescer(
+                lambda text: self._emit(EventType.LLM_CHUNK, run, step, attempt, {"delta": text})
+            )
+        
+        pending = [rule.expected for rule in step.validations]
+        usage: dict = {}
+        buffer = ""
+        deltas = stream(
+            model=step.model,
+            prompt=prompt,
+            system_prompt=step.system_prompt,
+            usage=usage,
+        )
+        try:
+            async for delta in deltas:
+                buffer += delta
+                if coalescer is not None:
+                    coalescer(delta)
+                # A new match must overlap this delta, so only the tail is searched
+                pending = [e for e in pending if e not in buffer[-(len(delta) + len(e) - 1):]]
+                if not pending:
+                    break
+        finally:
+            await deltas.aclose()  # Closes the HTTP stream; generation stops
+        if coalescer is not None:
+            coalescer.flush()
+        
+        # Usage is only reported at the end of a stream, so an early stop records 0
+        return LLMResponse(
+            content=buffer,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+    
+    async def _run_validations(self, step: Step, output: str) -> Optional[str]:
+        """
+        Run the step's validation rules; return the first failure reason (or None).
+        
+        WHY cheapest first: Local checks (CONTAINS, regex, syntax) take
+        microseconds, an LLM_JUDGE takes a round trip and tokens. Running the
+        local ones first, one at a time, means any failure aborts before
+        paying for a judge call.
+        
+        WHY gather for the rest: Remote rules are independent network calls,
+        so latency becomes max(rule) instead of sum(rule).
+        
+        A validator with validate_many (ValidatorDispatcher) gets the whole
+        cost-ordered list in one call and applies the same policy itself,
+        without a coroutine per local rule.
+        
+        An exception raised by the validator counts as a failed validation
+        (so the step retries), however many rules the step has.
+        """
+        if not step.validations:
+            return None
+        
+        ordered = sorted(step.validations, key=lambda r: _RULE_COST.get(r.type, 5))
+        
+        if self._validate_many is not None:
+            try:
+                results = await self._validate_many(output, ordered, self.llm_client)
+            except Exception as e:
+                return f"Validation error: {e}"
+            for rule, result in zip(ordered, results):
+                if result is not None and not result.passed:
+                    return result.error or f"Validation failed: {rule.type.value}"
+            return None
+        
+        local = [r for r in ordered if _RULE_COST.get(r.type, 5) < REMOTE_RULE_COST]
+        remote = ordered[len(local):]
+        
+        for rule in local:
+            try:
+                result = await self.validator.validate(
+                    output=output,
+                    rule=rule,
+                    llm_client=self.llm_client,
+                )
+            except Exception as e:
+                return f"Validation error ({rule.type.value}): {e}"
+            if not result.passed:
+                return result.error or f"Validation failed: {rule.type.value}"
+        
+        if not remote:
+            return None
+        if len(remote) < PARALLEL_VALIDATION_THRESHOLD:
+            try:
+                results = [
+                    await self.validator.validate(
+                        output=output,
+                        rule=remote[0],
+                        llm_client=self.llm_client,  # For LLM_JUDGE
+                    )
+                ]
+            except Exception as e:
+                results = [e]  # Reported below, as in the gathered case
+        else:
+            results = await asyncio.gather(
+                *(
+                    self.validator.validate(
+                        output=output,
+                        rule=rule,
+                        llm_client=self.llm_client,
+                    )
+                    for rule in remote
+                ),
+                return_exceptions=True,
+            )
+        
+        for rule, result in zip(remote, results):
+            if isinstance(result, Exception):
+                return f"Validation error ({rule.type.value}): {result}"
+            if not result.passed:
+                return result.error or f"Validation failed: {rule.type.value}"
+        return None
+    
+    def _prefetch(self, step: Step) -> "asyncio.Task[LLMResponse]":
+        """Start `step`'s first LLM call early. Only valid for context-free steps."""
+        task = asyncio.create_task(
+            self.llm_client.call(
+                model=step.model,
+                prompt=self._build_prompt(step, ""),
+                system_prompt=step.system_prompt,
+            )
+        )
+        # Retrieve the exception of a discarded task so it isn't logged as unhandled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+    
+    def _plan_batches(self, workflow: Workflow, start: int = 0) -> list[list[Step]]:
+        """
+        Group steps (from sorted_steps[start:]) into batches that can execute concurrently.
+        
+        A batch is a step followed by every consecutive step that does not
+        reference {{context}}. Without parallel_steps each step is its own batch.
+        """
+        steps = workflow.sorted_steps[start:]
+        if not self.parallel_steps:
+            return [[step] for step in steps]
+        
+        mask = workflow.context_dependent_mask >> start
+        batches: list[list[Step]] = []
+        for i, step in enumerate(steps):
+            if batches and not (mask >> i) & 1:
+                batches[-1].append(step)
+            else:
+                batches.append([step])
+        return batches
     
     async def _execute_step(
         self,
         step: Step,
         run: WorkflowRun,
         context: str,
+        prefetched: Optional["asyncio.Task[LLMResponse]"] = None,
     ) -> tuple[StepRun, bool, str]:
         max_attempts = step.max_retries + 1  # max_retries=2 means 3 attempts
         
+        # One record per step, reset at the top of each attempt
+        # WHY: Only the last attempt's record is kept in run.step_runs, so
+        # building (and validating) a fresh StepRun per retry is wasted work.
+        step_run = StepRun(step_id=step.id, input_context=context)
+        
         for attempt in range(1, max_attempts + 1):
-            # Create a new StepRun for this attempt
-            step_run = StepRun(
-                step_id=step.id,
-                attempt=attempt,
-                status=StepStatus.RUNNING,
-                input_context=context,
-                started_at=datetime.utcnow(),
-            )
+            step_run.attempt = attempt
+            step_run.status = StepStatus.RUNNING
+            step_run.output = None
+            step_run.error = None
+            step_run.prompt_tokens = 0
+            step_run.completion_tokens = 0
+            step_run.started_at = utc_now()
+            step_run.finished_at = None
             
             # Emit step_started event
             self._emit(
@@ -190,13 +600,36 @@ class Orchestrator:
             # ─────────────────────────────────────────────────────────────
             # STEP 1: Call LLM
             # ─────────────────────────────────────────────────────────────
+            cache_key: Optional[str] = None
+            from_cache = False
             try:
                 final_prompt = self._build_prompt(step, context)
-                llm_response = await self.llm_client.call(
-                    model=step.model,
-                    prompt=final_prompt,
-                    system_prompt=step.system_prompt,
-                )
+                if self.cache is not None:
+                    cache_key = LLMCache.make_key(step.model, step.system_prompt, final_prompt)
+                    cached = await self.cache.get(cache_key)
+                    from_cache = cached is not None
+                
+                if from_cache:
+                    if prefetched is not None:
+                        prefetched.cancel()
+                    # No tokens spent, so nothing is added to the run's cost
+                    self.cache_hits += 1
+                    llm_response = LLMResponse(content=cached)
+                    if self.stream_output:
+                        self._emit(EventType.LLM_CHUNK, run, step, attempt, {"delta": cached})
+                else:
+                    if cache_key is not None:
+                        self.cache_misses += 1
+                    if prefetched is not None and attempt == 1:
+                        # Sent while the previous step was still running
+                        llm_response = await prefetched
+                        if self.stream_output:
+                            self._emit(
+                                EventType.LLM_CHUNK, run, step, attempt,
+                                {"delta": llm_response.content},
+                            )
+                    else:
+                        llm_response = await self._call_llm(step, run, attempt, final_prompt)
                 
                 # Update step run with LLM output
                 step_run.output = llm_response.content
@@ -204,18 +637,20 @@ class Orchestrator:
                 step_run.completion_tokens = llm_response.completion_tokens
                 
                 # Emit llm_output event
+                # Sliced once; slicing a shorter string returns it without copying
+                output_preview = llm_response.content[:OUTPUT_PREVIEW_CHARS]
                 self._emit(
                     EventType.LLM_OUTPUT,
                     run,
                     step,
                     attempt,
-                    {"output": llm_response.content[:500]},
+                    {"output": output_preview},
                 )
                 
             except Exception as e:
                 step_run.status = StepStatus.FAILED
                 step_run.error = f"LLM call failed: {str(e)}"
-                step_run.finished_at = datetime.utcnow()
+                step_run.finished_at = utc_now()
                 
                 self._emit(
                     EventType.VALIDATION_FAILED,
@@ -233,20 +668,8 @@ class Orchestrator:
             # ─────────────────────────────────────────────────────────────
             # STEP 2: Run all validations
             # ─────────────────────────────────────────────────────────────
-            all_passed = True
-            failed_reason = None
-            
-            for rule in step.validations:
-                result = await self.validator.validate(
-                    output=llm_response.content,
-                    rule=rule,
-                    llm_client=self.llm_client,  # For LLM_JUDGE
-                )
-                
-                if not result.passed:
-                    all_passed = False
-                    failed_reason = result.error or f"Validation failed: {rule.type.value}"
-                    break  # Stop on first failure
+            failed_reason = await self._run_validations(step, llm_response.content)
+            all_passed = failed_reason is None
             
             # ─────────────────────────────────────────────────────────────
             # STEP 3: Handle validation result
@@ -254,7 +677,9 @@ class Orchestrator:
             if all_passed:
                 # SUCCESS — step passed
                 step_run.status = StepStatus.PASSED
-                step_run.finished_at = datetime.utcnow()
+                step_run.finished_at = utc_now()
+                if cache_key is not None and not from_cache:
+                    await self.cache.set(cache_key, llm_response.content)
                 
                 self._emit(
                     EventType.VALIDATION_PASSED,
@@ -268,7 +693,7 @@ class Orchestrator:
                     run,
                     step,
                     attempt,
-                    {"output": llm_response.content[:500]},
+                    {"output": output_preview},
                 )
                 
                 # Return success with new context (LLM output becomes context)
@@ -279,7 +704,10 @@ class Orchestrator:
                 # FAILURE — validation failed
                 step_run.status = StepStatus.FAILED
                 step_run.error = failed_reason
-                step_run.finished_at = datetime.utcnow()
+                step_run.finished_at = utc_now()
+                if from_cache:
+                    # Rules changed (or a judge disagreed); don't replay it on retry
+                    await self.cache.delete(cache_key)
                 
                 self._emit(
                     EventType.VALIDATION_FAILED,
@@ -311,115 +739,354 @@ class Orchestrator:
         workflow: Workflow,
         initial_context: str = "",
         run_id: Optional[UUID] = None,
+        run: Optional[WorkflowRun] = None,
     ) -> WorkflowRun:
+        """
+        Execute `workflow` and return its WorkflowRun.
+        
+        Pass an existing `run` to have it updated in place as steps complete
+        (WorkflowRun isn't frozen), so callers holding a reference see live
+        progress without copying/revalidating the record.
+        """
         # ─────────────────────────────────────────────────────────────────
         # INITIALIZE RUN
         # ─────────────────────────────────────────────────────────────────
+        if run is None:
+            run = WorkflowRun(id=run_id or uuid4(), workflow_id=workflow.id)
+        run.status = RunStatus.RUNNING
+        run.context = initial_context
+        if run.started_at is None:
+            run.started_at = utc_now()
+        
+        self._open_sink()
+        try:
+            self._emit(
+                EventType.RUN_STARTED,
+                run,
+                payload={"workflow_name": workflow.name, "step_count": len(workflow.steps)},
+            )
+            if workflow.is_dag:
+                return await self._run_dag(workflow, run, initial_context)
+            return await self._run_steps(
+                workflow, run, start=0, context=initial_context, initial_context=initial_context,
+            )
+        finally:
+            await self._close_sink()
+    
+    async def resume(self, workflow: Workflow, run_id: UUID) -> WorkflowRun:
+        """
+        Continue a run from its last checkpoint; passed steps are not re-run.
+        
+        Raises:
+            ValueError: No checkpoint store is configured, or none saved for run_id
+        """
+        state = await self.checkpoint.load(run_id) if self.checkpoint else None
+        if state is None:
+            raise ValueError(f"No checkpoint for run {run_id}")
+        
         run = WorkflowRun(
             id=run_id,
             workflow_id=workflow.id,
             status=RunStatus.RUNNING,
-            context=initial_context,
-            started_at=datetime.utcnow(),
+            context=state.context,
+            step_runs=dict(state.step_runs),
+            total_cost_usd=state.total_cost_usd,
+            started_at=utc_now(),
         )
-        
-        self._emit(
-            EventType.RUN_STARTED,
-            run,
-            payload={"workflow_name": workflow.name, "step_count": len(workflow.steps)},
-        )
-        
+        self._open_sink()
+        try:
+            self._emit(
+                EventType.RUN_STARTED,
+                run,
+                payload={
+                    "workflow_name": workflow.name,
+                    "step_count": len(workflow.steps),
+                    "resumed_from": state.step_idx,
+                },
+            )
+            if workflow.is_dag:
+                return await self._run_dag(workflow, run, state.initial_context)
+            return await self._run_steps(
+                workflow, run, start=state.step_idx, context=state.context,
+                initial_context=state.initial_context,
+            )
+        finally:
+            await self._close_sink()
+    
+    async def _run_steps(
+        self,
+        workflow: Workflow,
+        run: WorkflowRun,
+        start: int,
+        context: str,
+        initial_context: str = "",
+    ) -> WorkflowRun:
+        """Execute sorted_steps[start:] with `context` as the incoming context."""
         # ─────────────────────────────────────────────────────────────────
-        # SORT STEPS BY ORDER
-        # WHY: Steps may be stored out of order; order field is authoritative
+        # STEPS BY ORDER
+        # WHY: Steps may be stored out of order; order field is authoritative.
+        # Sorted once when the Workflow was validated.
         # ─────────────────────────────────────────────────────────────────
-        sorted_steps = sorted(workflow.steps, key=lambda s: s.order)
+        sorted_steps = workflow.sorted_steps
         
         # ─────────────────────────────────────────────────────────────────
-        # EXECUTE STEPS SEQUENTIALLY
+        # EXECUTE STEPS (sequentially, or in context-free batches)
         # ─────────────────────────────────────────────────────────────────
-        current_context = initial_context
+        current_context = context
+        batches = self._plan_batches(workflow, start)
+        mask = workflow.context_dependent_mask
+        position = start  # Index in sorted_steps just past the current batch
+        prefetch: Optional[asyncio.Task] = None
         
-        for step in sorted_steps:
-            run.current_step_order = step.order
+        for i, batch in enumerate(batches):
+            run.current_step_order = batch[0].order
+            position += len(batch)
             
-            # Execute step (handles retries internally)
-            step_run, success, new_context = await self._execute_step(
-                step=step,
-                run=run,
-                context=current_context,
-            )
-            
-            # Record step run (keyed by step UUID)
-            run.step_runs[step.id] = step_run
+            # Speculatively send the next step's call if it can't see our output
+            next_prefetch: Optional[asyncio.Task] = None
+            if self.speculative and i + 1 < len(batches) and not (mask >> position) & 1:
+                next_prefetch = self._prefetch(batches[i + 1][0])
             
-            # Accumulate cost
-            # WHY: Simple cost tracking — we'll estimate USD later
-            run.total_cost_usd += self._estimate_cost(
-                step_run.prompt_tokens,
-                step_run.completion_tokens,
-                step.model,
-            )
-            
-            if success:
-                # Update context for next step
-                current_context = new_context
-                run.context = current_context
+            # Execute step(s) (retries are handled internally)
+            if len(batch) == 1:
+                results = [
+                    await self._execute_step(
+                        step=batch[0],
+                        run=run,
+                        context=current_context,
+                        prefetched=prefetch,
+                    )
+                ]
             else:
-                # Step failed permanently — abort workflow
-                run.status = RunStatus.FAILED
-                run.failure_reason = f"Step '{step.name}' failed: {step_run.error}"
-                run.finished_at = datetime.utcnow()
-                
-                # Mark remaining steps as skipped
-                for remaining_step in sorted_steps:
-                    if remaining_step.order > step.order:
-                        skipped_run = StepRun(
-                            step_id=remaining_step.id,
-                            status=StepStatus.SKIPPED,
-                        )
-                        run.step_runs[remaining_step.id] = skipped_run
+                results = await asyncio.gather(*(
+                    self._execute_step(
+                        step=step,
+                        run=run,
+                        context=current_context,
+                        prefetched=prefetch if j == 0 else None,
+                    )
+                    for j, step in enumerate(batch)
+                ))
+            prefetch = next_prefetch
+            
+            failed: Optional[tuple[Step, StepRun]] = None
+            for step, (step_run, success, new_context) in zip(batch, results):
+                # Record step run (keyed by step UUID)
+                run.step_runs[step.id] = step_run
                 
-                self._emit(
-                    EventType.RUN_FAILED,
-                    run,
-                    payload={"reason": run.failure_reason},
+                # Accumulate cost
+                # WHY: Simple cost tracking — we'll estimate USD later
+                # Every step in a batch ran, so all of them are paid for.
+                run.total_cost_usd += self._estimate_cost(
+                    step_run.prompt_tokens,
+                    step_run.completion_tokens,
+                    step.model,
                 )
                 
-                return run
+                if failed is not None:
+                    continue
+                if success:
+                    # Update context for next step
+                    current_context = new_context
+                    run.context = current_context
+                else:
+                    failed = (step, step_run)
+            
+            if failed is not None:
+                # Step failed permanently — abort workflow
+                if prefetch is not None:
+                    prefetch.cancel()
+                # WHY slice: every step up to `position` ran in this or an
+                # earlier batch, so the rest never started.
+                return self._fail_run(run, *failed, skipped=sorted_steps[position:])
+            
+            if self.checkpoint is not None:
+                await self.checkpoint.save(run.id, RunState(
+                    step_idx=position,
+                    context=current_context,
+                    step_runs=dict(run.step_runs),
+                    total_cost_usd=run.total_cost_usd,
+                    initial_context=initial_context,
+                ))
         
         # ─────────────────────────────────────────────────────────────────
         # ALL STEPS COMPLETED SUCCESSFULLY
         # ─────────────────────────────────────────────────────────────────
+        return await self._complete_run(run, current_context)  # Last step's output
+    
+    async def _run_dag(
+        self,
+        workflow: Workflow,
+        run: WorkflowRun,
+        initial_context: str,
+    ) -> WorkflowRun:
+        """
+        Execute a workflow whose steps declare depends_on (Kahn's algorithm).
+        
+        A step starts as soon as every dependency passed; its context is the
+        dependency's output (several are joined with DAG_CONTEXT_SEPARATOR).
+        Latency is the critical path rather than the sum of all steps.
+        Steps with a PASSED record in run.step_runs (a resumed run) are done.
+        
+        On failure no new steps start; steps already in flight finish and are
+        recorded (they're paid for), the rest are SKIPPED.
+        """
+        steps = {step.id: step for step in workflow.sorted_steps}
+        dependencies = workflow.dependencies
+        outputs: dict[UUID, str] = {
+            step_id: step_run.output or ""
+            for step_id, step_run in run.step_runs.items()
+            if step_run.status == StepStatus.PASSED
+        }
+        
+        # Unfinished dependency count per pending step; zero means ready
+        waiting = {
+            step_id: sum(dep not in outputs for dep in dependencies[step_id])
+            for step_id in steps
+            if step_id not in outputs
+        }
+        ready = [steps[step_id] for step_id, n in waiting.items() if n == 0]
+        in_flight: dict[asyncio.Task, Step] = {}
+        failed: Optional[tuple[Step, StepRun]] = None
+        
+        try:
+            while True:
+                if failed is None:
+                    for step in ready:
+                        deps = dependencies[step.id]
+                        if not deps:
+                            context = initial_context
+                        else:
+                            context = DAG_CONTEXT_SEPARATOR.join(outputs[dep] for dep in deps)
+                        run.current_step_order = step.order
+                        task = asyncio.create_task(
+                            self._execute_step(step=step, run=run, context=context)
+                        )
+                        in_flight[task] = step
+                    ready = []
+                if not in_flight:
+                    break
+                
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = in_flight.pop(task)
+                    step_run, success, new_context = task.result()
+                    run.step_runs[step.id] = step_run
+                    run.total_cost_usd += self._estimate_cost(
+                        step_run.prompt_tokens,
+                        step_run.completion_tokens,
+                        step.model,
+                    )
+                    
+                    if not success:
+                        failed = failed or (step, step_run)
+                        continue
+                    outputs[step.id] = new_context
+                    run.context = new_context
+                    for dependent in workflow.dependents[step.id]:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0:
+                            ready.append(steps[dependent])
+                    
+                    if self.checkpoint is not None:
+                        await self.checkpoint.save(run.id, RunState(
+                            step_idx=len(outputs),
+                            context=new_context,
+                            step_runs=dict(run.step_runs),
+                            total_cost_usd=run.total_cost_usd,
+                            initial_context=initial_context,
+                        ))
+        finally:
+            for task in in_flight:
+                task.cancel()  # Only reached with tasks left if a step raised
+        
+        if failed is not None:
+            return self._fail_run(
+                run,
+                *failed,
+                skipped=[step for step in workflow.sorted_steps if step.id not in run.step_runs],
+            )
+        # The last step by order is the workflow's output
+        return await self._complete_run(run, outputs[workflow.sorted_steps[-1].id])
+    
+    def _fail_run(
+        self,
+        run: WorkflowRun,
+        step: Step,
+        step_run: StepRun,
+        skipped: Sequence[Step],
+    ) -> WorkflowRun:
+        run.status = RunStatus.FAILED
+        run.failure_reason = f"Step '{step.name}' failed: {step_run.error}"
+        run.finished_at = utc_now()
+        
+        # Mark remaining (never started) steps as skipped
+        # WHY model_construct: these records carry no data worth validating
+        for remaining_step in skipped:
+            run.step_runs[remaining_step.id] = StepRun.model_construct(
+                step_id=remaining_step.id,
+                status=StepStatus.SKIPPED,
+            )
+        
+        self._emit(
+            EventType.RUN_FAILED,
+            run,
+            payload={"reason": run.failure_reason},
+        )
+        return run
+    
+    async def _complete_run(self, run: WorkflowRun, final_output: str) -> WorkflowRun:
         run.status = RunStatus.COMPLETED
-        run.final_output = current_context  # Last step's output
-        run.finished_at = datetime.utcnow()
+        run.final_output = final_output
+        run.finished_at = utc_now()
+        
+        # A completed run is never resumed; keep only failed runs' checkpoints
+        if self.checkpoint is not None:
+            await self.checkpoint.delete(run.id)
         
         self._emit(
             EventType.RUN_COMPLETED,
             run,
             payload={"total_cost_usd": run.total_cost_usd},
         )
-        
         return run
     
+    async def run_many(
+        self,
+        workflows: list[Workflow],
+        initial_contexts: Optional[list[str]] = None,
+        max_concurrency: int = RUN_MANY_CONCURRENCY,
+    ) -> list[WorkflowRun]:
+        """
+        Execute independent workflows concurrently; results are in input order.
+        
+        WHY a semaphore: Runs are I/O-bound, so they scale almost linearly on
+        one event loop until the provider's rate limit. Bounding them keeps a
+        large batch from opening more requests than the connection pool holds.
+        """
+        contexts = initial_contexts or [""] * len(workflows)
+        if len(contexts) != len(workflows):
+            raise ValueError("initial_contexts must match workflows in length")
+        
+        sem = asyncio.Semaphore(max_concurrency)
+        
+        async def _bounded(workflow: Workflow, context: str) -> WorkflowRun:
+            async with sem:
+                return await self.run(workflow, context)
+        
+        return list(await asyncio.gather(*(
+            _bounded(workflow, context)
+            for workflow, context in zip(workflows, contexts)
+        )))
+    
     def _estimate_cost(
         self,
         prompt_tokens: int,
         completion_tokens: int,
         model: ModelName,
     ) -> float:
-        rates = {
-            ModelName.KIMI_K2_INSTRUCT: {"prompt": 0.001, "completion": 0.002},
-            ModelName.KIMI_K2P5: {"prompt": 0.002, "completion": 0.004},
-        }
-        
-        rate = rates.get(model, {"prompt": 0.001, "completion": 0.002})
-        
-        prompt_cost = (prompt_tokens / 1000) * rate["prompt"]
-        completion_cost = (completion_tokens / 1000) * rate["completion"]
-        
-        return prompt_cost + completion_cost
+        prompt_rate, completion_rate = _RATES_PER_TOKEN.get(model, _DEFAULT_RATES_PER_TOKEN)
+        return prompt_tokens * prompt_rate + completion_tokens * completion_rate
 
 
 # =============================================================================
@@ -431,6 +1098,13 @@ def create_orchestrator(
     validator: Optional[Validator] = None,
     on_event: Optional[EventCallback] = None,
     use_real_validator: bool = True,
+    parallel_steps: bool = False,
+    stream_output: bool = False,
+    cache: Optional[LLMCache] = None,
+    speculative: bool = False,
+    early_stop: bool = False,
+    checkpoint: Optional[CheckpointStore] = None,
+    event_queue_size: int = EVENT_QUEUE_SIZE,
 ) -> Orchestrator:
     """
     Create an orchestrator with optional dependency injection.
@@ -440,6 +1114,13 @@ def create_orchestrator(
         validator: Validator implementation (defaults to ValidatorDispatcher)
         on_event: Callback for execution events
         use_real_validator: If True, uses ValidatorDispatcher; if False, uses stub
+        parallel_steps: Run context-free steps concurrently with their predecessor
+        stream_output: Stream LLM output as LLM_CHUNK events
+        cache: Reuse validated outputs for identical LLM requests
+        speculative: Send a context-free step's LLM call during the previous step
+        early_stop: Stop streaming once a CONTAINS-only step's rules are satisfied
+        checkpoint: Save progress after each batch so runs can be resumed
+        event_queue_size: Bound on events queued for an async on_event
     
     WHY use_real_validator flag:
     - Default True: production behavior with real validation
@@ -460,4 +1141,11 @@ def create_orchestrator(
         llm_client=llm_client or StubLLMClient(),
         validator=actual_validator,
         on_event=on_event,
+        parallel_steps=parallel_steps,
+        stream_output=stream_output,
+        cache=cache,
+        speculative=speculative,
+        early_stop=early_stop,
+        checkpoint=checkpoint,
+        event_queue_size=event_queue_size,
     )
@@ -0,0 +1,127 @@
+"""
+Regex compilation for the regex_match validator.
+
+WHY a module of its own:
+Choosing the engine for a pattern (str methods, RE2 or re) has enough rules
+of its own to keep out of validators.py, which just calls compile_pattern.
+Rules don't hold compiled patterns: the cache below is keyed on the pattern
+text, so it stays correct for rules copied with model_copy(update=...).
+
+WHY RE2 (when installed):
+Patterns come from workflow authors and run against LLM output. Python's
+re backtracks, so a pattern like (a+)+b can take exponential time on the
+wrong output and stall the event loop. RE2 matches in linear time. It
+rejects backreferences and lookaround; those patterns fall back to re.
+
+RE2's \\d, \\w, \\s, \\b and their negations are ASCII-only, while re's
+match any Unicode digit, letter or space. \\bcafé\\b would miss "un café!"
+under RE2, so patterns using those classes always use re.
+
+RE2's $ matches only at the very end of the text, while re's also matches
+just before a final newline, and LLM output usually ends in one. So
+^\\d+$ would fail on "123\\n" under RE2. Patterns containing $ always use re.
+
+WHY a literal fast path:
+Many rules are plain text, optionally anchored (^Answer:, DONE$). Those are
+matched with `in`/startswith/endswith, several times faster than either
+engine; RE2 in particular pays to encode the text on every search.
+
+WHY lru_cache:
+re.search(pattern, s) hashes the pattern into re's internal cache on every
+call, and recompiles once more than re._MAXCACHE patterns are in play.
+Compiling through a larger cache and calling .search() on the result skips
+both.
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional, Union
+
+try:
+    import re2
+except ImportError:  # Optional: without it every pattern uses re
+    re2 = None
+
+
+# Distinct patterns kept compiled; far more than any set of workflows uses
+PATTERN_CACHE_SIZE = 1024
+
+# Memory budget for one compiled RE2 program (bytes)
+RE2_MAX_MEM = 8 << 20
+
+if re2 is not None:
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.max_mem = RE2_MAX_MEM
+    _RE2_OPTIONS.log_errors = False  # Rejections are expected; we fall back quietly
+
+
+# Characters that make a pattern more than literal text
+_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+# A \d, \w, \s or \b class (or negation), but not an escaped backslash + d
+_UNICODE_CLASS = re.compile(r"(?<!\\)(?:\\\\)*\\[dwsbDWSB]")
+
+
+class LiteralPattern:
+    """
+    A pattern with no metacharacters, optionally anchored with ^ and/or $.
+
+    search() is truthy exactly when re.search would match. As in re, $
+    also matches just before a final newline.
+    """
+
+    __slots__ = ("pattern", "_literal", "_with_newline", "_anchor_start", "_anchor_end")
+
+    def __init__(self, pattern: str, literal: str, anchor_start: bool, anchor_end: bool):
+        self.pattern = pattern
+        self._literal = literal
+        self._with_newline = literal + "\n"
+        self._anchor_start = anchor_start
+        self._anchor_end = anchor_end
+
+    def search(self, text: str) -> bool:
+        if self._anchor_start and self._anchor_end:
+            return text == self._literal or text == self._with_newline
+        if self._anchor_start:
+            return text.startswith(self._literal)
+        if self._anchor_end:
+            return text.endswith(self._literal) or text.endswith(self._with_newline)
+        return self._literal in text
+
+
+def _as_literal(pattern: str) -> Optional[LiteralPattern]:
+    anchor_start = pattern.startswith("^")
+    anchor_end = pattern.endswith("$") and len(pattern) > anchor_start
+    literal = pattern[anchor_start:len(pattern) - anchor_end]
+    if _METACHARS.isdisjoint(literal):
+        return LiteralPattern(pattern, literal, anchor_start, anchor_end)
+    return None
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern: str) -> Union[re.Pattern, LiteralPattern]:
+    """
+    Compile `pattern`, reusing the result for identical patterns.
+
+    Returns a LiteralPattern for plain (optionally ^/$-anchored) text, an
+    RE2 pattern when re2 is installed, the pattern has no $ or Unicode-aware
+    class (\\d, \\w, \\s, \\b, ...) and RE2 accepts it, else an re.Pattern;
+    all provide .search(text), truthy on a match.
+
+    Raises:
+        re.error: The pattern is invalid (not cached; raised again next time)
+    """
+    literal = _as_literal(pattern)
+    if literal is not None:
+        return literal
+    if re2 is not None and "$" not in pattern and not _UNICODE_CLASS.search(pattern):
+        try:
+            return re2.compile(pattern, _RE2_OPTIONS)
+        except re2.error:
+            pass  # Backreferences, lookaround, ...: only re supports them
+    return re.compile(pattern)
+
+
+def releases_gil(regex: Union[re.Pattern, LiteralPattern]) -> bool:
+    """True if searching with `regex` lets other threads run meanwhile (RE2 only)."""
+    return not isinstance(regex, (re.Pattern, LiteralPattern))
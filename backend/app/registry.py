@@ -0,0 +1,91 @@
+"""
+Run registry: in-memory state for workflow runs and their live subscribers.
+
+Holds, per run:
+- The WorkflowRun record served by /runs
+- Events buffered until the first WebSocket connects
+- The set of connected WebSockets
+- An asyncio.Event set when the run reaches a terminal state
+
+WHY a lock per run:
+Execution tasks, the WebSocket handler and REST handlers all touch this state
+from different asyncio tasks. Anything that awaits while reading it (sending
+buffered events, broadcasting) must not interleave with a connect/disconnect,
+otherwise events can be dropped or delivered out of order. Those sends can
+be slow, so the lock is per run: a slow client stalls only its own run's
+broadcasts, never other runs or eviction (which doesn't await, so it needs
+no lock).
+
+WHY TTL eviction:
+Nothing else ever removes finished runs, so a long-lived process would grow
+without bound. Finished runs with no open connections are dropped after
+RUN_TTL_SECONDS.
+"""
+
+import asyncio
+import os
+import time
+from collections import defaultdict
+from uuid import UUID
+
+from fastapi import WebSocket
+
+from .models import ExecutionEvent, WorkflowRun
+
+
+# How long a finished run stays queryable (seconds)
+RUN_TTL_SECONDS = float(os.getenv("RUN_TTL_SECONDS", "3600"))
+
+# How often the janitor task looks for expired runs (seconds)
+EVICTION_INTERVAL_SECONDS = 60.0
+
+
+class RunRegistry:
+    def __init__(self, ttl_seconds: float = RUN_TTL_SECONDS):
+        self.runs: dict[UUID, WorkflowRun] = {}
+        # Present from run creation; events are buffered while no WS is connected
+        self.pending: dict[UUID, list[ExecutionEvent]] = {}
+        # Sets make disconnect O(1) instead of list.remove
+        self.conns: defaultdict[UUID, set[WebSocket]] = defaultdict(set)
+        # Set on completion/failure so WebSocket handlers can react immediately
+        self.done: dict[UUID, asyncio.Event] = {}
+        # Held across a run's broadcasts and its connects/disconnects
+        self.locks: defaultdict[UUID, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.ttl_seconds = ttl_seconds
+        # run_id -> time.monotonic() when the run reached a terminal state
+        self._finished_at: dict[UUID, float] = {}
+
+    def add(self, run: WorkflowRun) -> None:
+        """Register a new run with an empty event buffer."""
+        self.runs[run.id] = run
+        self.pending[run.id] = []
+        self.done[run.id] = asyncio.Event()
+
+    def mark_finished(self, run_id: UUID) -> None:
+        """Signal waiters and start the TTL clock for a run that completed or failed."""
+        self._finished_at[run_id] = time.monotonic()
+        if run_id in self.done:
+            self.done[run_id].set()
+
+    def evict_expired(self) -> int:
+        """Drop finished runs past their TTL that nobody is watching."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [
+            run_id
+            for run_id, finished_at in self._finished_at.items()
+            if finished_at < cutoff and not self.conns.get(run_id)
+        ]
+        for run_id in expired:
+            self.runs.pop(run_id, None)
+            self.pending.pop(run_id, None)
+            self.conns.pop(run_id, None)
+            self.done.pop(run_id, None)
+            self.locks.pop(run_id, None)
+            del self._finished_at[run_id]
+        return len(expired)
+
+    async def evict_loop(self, interval: float = EVICTION_INTERVAL_SECONDS) -> None:
+        """Janitor task: periodically evict expired runs until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_expired()
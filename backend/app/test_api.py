@@ -14,6 +14,7 @@ Prerequisites:
 """
 
 import asyncio
+import uuid
 import httpx
 import websockets
 import json
@@ -22,95 +23,95 @@ import json
 BASE_URL = "http://localhost:8000"
 WS_BASE_URL = "ws://localhost:8000"
 
+# After a message arrives, keep reading until the socket is idle this long (seconds)
+DRAIN_TIMEOUT = 0.001
 
-async def test_health():
+
+async def test_health(client: httpx.AsyncClient):
     """Test health endpoint."""
     print("\n--- HEALTH CHECK ---")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/health")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "healthy"
-        print(f"✓ Health check passed: {data}")
+    response = await client.get("/health")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    print(f"✓ Health check passed: {data}")
 
 
-async def test_workflow_crud():
+async def test_workflow_crud(client: httpx.AsyncClient):
     """Test workflow CRUD operations."""
     print("\n--- WORKFLOW CRUD ---")
     
-    async with httpx.AsyncClient() as client:
-        # Create workflow
-        workflow_data = {
-            "name": "Test Workflow",
-            "description": "A simple test workflow",
-            "steps": [
-                {
-                    "name": "Generate greeting",
-                    "order": 0,
-                    "model": "kimi-k2-instruct-0905",
-                    "prompt": "Say hello in a creative way.",
-                    "validations": [
-                        {"type": "contains", "expected": "hello"}
-                    ],
-                    "max_retries": 2
-                }
-            ]
-        }
-        
-        response = await client.post(f"{BASE_URL}/workflows", json=workflow_data)
-        assert response.status_code == 200, f"Create failed: {response.text}"
-        workflow = response.json()
-        workflow_id = workflow["id"]
-        print(f"✓ Created workflow: {workflow_id}")
-        
-        # List workflows
-        response = await client.get(f"{BASE_URL}/workflows")
-        assert response.status_code == 200
-        workflows = response.json()
-        assert len(workflows) >= 1
-        print(f"✓ Listed workflows: {len(workflows)} found")
-        
-        # Get workflow
-        response = await client.get(f"{BASE_URL}/workflows/{workflow_id}")
-        assert response.status_code == 200
-        assert response.json()["name"] == "Test Workflow"
-        print(f"✓ Got workflow by ID")
-        
-        # Update workflow
-        response = await client.put(
-            f"{BASE_URL}/workflows/{workflow_id}",
-            json={"name": "Updated Workflow"}
-        )
-        assert response.status_code == 200
-        assert response.json()["name"] == "Updated Workflow"
-        print(f"✓ Updated workflow")
-        
-        # Export workflow
-        response = await client.get(f"{BASE_URL}/workflows/{workflow_id}/export")
-        assert response.status_code == 200
-        exported = response.json()
-        assert "name" in exported
-        print(f"✓ Exported workflow")
-        
-        return workflow_id
+    # Create workflow
+    workflow_data = {
+        "name": "Test Workflow",
+        "description": "A simple test workflow",
+        "steps": [
+            {
+                "name": "Generate greeting",
+                "order": 0,
+                "model": "kimi-k2-instruct-0905",
+                "prompt": "Say hello in a creative way.",
+                "validations": [
+                    {"type": "contains", "expected": "hello"}
+                ],
+                "max_retries": 2
+            }
+        ]
+    }
+    
+    response = await client.post("/workflows", json=workflow_data)
+    assert response.status_code == 200, f"Create failed: {response.text}"
+    workflow = response.json()
+    workflow_id = workflow["id"]
+    print(f"✓ Created workflow: {workflow_id}")
+    
+    # List workflows
+    response = await client.get("/workflows")
+    assert response.status_code == 200
+    workflows = response.json()
+    assert len(workflows) >= 1
+    print(f"✓ Listed workflows: {len(workflows)} found")
+    
+    # Get workflow
+    response = await client.get(f"/workflows/{workflow_id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == "Test Workflow"
+    print(f"✓ Got workflow by ID")
+    
+    # Update workflow
+    response = await client.put(
+        f"/workflows/{workflow_id}",
+        json={"name": "Updated Workflow"}
+    )
+    assert response.status_code == 200
+    assert response.json()["name"] == "Updated Workflow"
+    print(f"✓ Updated workflow")
+    
+    # Export workflow
+    response = await client.get(f"/workflows/{workflow_id}/export")
+    assert response.status_code == 200
+    exported = response.json()
+    assert "name" in exported
+    print(f"✓ Exported workflow")
+    
+    return workflow_id
 
 
-async def test_workflow_execution(workflow_id: str):
+async def test_workflow_execution(client: httpx.AsyncClient, workflow_id: str):
     """Test workflow execution with WebSocket events."""
     print("\n--- WORKFLOW EXECUTION ---")
     
-    async with httpx.AsyncClient() as client:
-        # Start workflow execution
-        response = await client.post(
-            f"{BASE_URL}/workflows/{workflow_id}/run",
-            json={"initial_context": ""}
-        )
-        assert response.status_code == 200, f"Run failed: {response.text}"
-        run_data = response.json()
-        run_id = run_data["run_id"]
-        ws_url = run_data["websocket_url"]
-        print(f"✓ Started run: {run_id}")
-        print(f"  WebSocket URL: {ws_url}")
+    # Start workflow execution
+    response = await client.post(
+        f"/workflows/{workflow_id}/run",
+        json={"initial_context": ""}
+    )
+    assert response.status_code == 200, f"Run failed: {response.text}"
+    run_data = response.json()
+    run_id = run_data["run_id"]
+    ws_url = run_data["websocket_url"]
+    print(f"✓ Started run: {run_id}")
+    print(f"  WebSocket URL: {ws_url}")
     
     # Connect to WebSocket and receive events
     print("\n  Connecting to WebSocket...")
@@ -123,20 +124,32 @@ async def test_workflow_execution(workflow_id: str):
             # Receive events with timeout
             while True:
                 try:
-                    message = await asyncio.wait_for(ws.recv(), timeout=60.0)
-                    event = json.loads(message)
-                    events_received.append(event)
-                    
-                    event_type = event.get("event") or event.get("type")
-                    print(f"  📡 Event: {event_type}")
-                    
-                    # Stop when run completes
-                    if event_type in ["run_completed", "run_failed", "run_ended"]:
-                        break
-                        
+                    messages = [await asyncio.wait_for(ws.recv(), timeout=60.0)]
                 except asyncio.TimeoutError:
                     print("  ⚠️ Timeout waiting for events")
                     break
+                
+                # Drain whatever else already arrived before processing the burst
+                while True:
+                    try:
+                        messages.append(await asyncio.wait_for(ws.recv(), timeout=DRAIN_TIMEOUT))
+                    except (asyncio.TimeoutError, websockets.ConnectionClosed):
+                        break  # Idle, or the server closed after its last message
+                
+                batch = []
+                for message in messages:
+                    data = json.loads(message)
+                    # Buffered events arrive as one JSON array frame
+                    batch.extend(data if isinstance(data, list) else [data])
+                events_received.extend(batch)
+                
+                event_types = [event.get("event") or event.get("type") for event in batch]
+                for event_type in event_types:
+                    print(f"  📡 Event: {event_type}")
+                
+                # Stop when run completes
+                if any(t in ["run_completed", "run_failed", "run_ended"] for t in event_types):
+                    break
                     
     except Exception as e:
         print(f"  WebSocket error: {e}")
@@ -144,28 +157,61 @@ async def test_workflow_execution(workflow_id: str):
     print(f"\n  Total events received: {len(events_received)}")
     
     # Check final run status
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/runs/{run_id}")
-        assert response.status_code == 200
-        run = response.json()
-        print(f"✓ Final run status: {run['status']}")
-        if run.get("final_output"):
-            print(f"  Final output: {run['final_output'][:100]}...")
-        if run.get("failure_reason"):
-            print(f"  Failure reason: {run['failure_reason']}")
+    response = await client.get(f"/runs/{run_id}")
+    assert response.status_code == 200
+    run = response.json()
+    print(f"✓ Final run status: {run['status']}")
+    if run.get("final_output"):
+        print(f"  Final output: {run['final_output'][:100]}...")
+    if run.get("failure_reason"):
+        print(f"  Failure reason: {run['failure_reason']}")
     
     return run_id
 
 
-async def test_list_runs():
+async def test_invalid_dependencies(client: httpx.AsyncClient):
+    """Bad depends_on is a client error (422), on create and on update."""
+    print("\n--- INVALID DEPENDS_ON ---")
+    
+    a, b = str(uuid.uuid4()), str(uuid.uuid4())
+    
+    def step(step_id: str, order: int, depends_on):
+        return {
+            "id": step_id,
+            "name": f"Step {order}",
+            "order": order,
+            "model": "kimi-k2-instruct-0905",
+            "prompt": "Say hi",
+            "depends_on": depends_on,
+        }
+    
+    response = await client.post("/workflows", json={"name": "Unknown dep", "steps": [step(a, 0, [b])]})
+    assert response.status_code == 422, f"Expected 422, got {response.status_code}: {response.text}"
+    print("✓ Unknown dependency rejected with 422")
+    
+    response = await client.post(
+        "/workflows", json={"name": "Cycle", "steps": [step(a, 0, [b]), step(b, 1, [a])]}
+    )
+    assert response.status_code == 422, f"Expected 422, got {response.status_code}: {response.text}"
+    print("✓ Cycle rejected with 422")
+    
+    response = await client.post("/workflows", json={"name": "Valid", "steps": [step(a, 0, None)]})
+    assert response.status_code == 200, f"Create failed: {response.text}"
+    workflow_id = response.json()["id"]
+    response = await client.put(f"/workflows/{workflow_id}", json={"steps": [step(a, 0, [a])]})
+    assert response.status_code == 422, f"Expected 422, got {response.status_code}: {response.text}"
+    await client.delete(f"/workflows/{workflow_id}")
+    print("✓ Self-dependency on update rejected with 422")
+
+
+async def test_list_runs(client: httpx.AsyncClient):
     """Test listing runs."""
     print("\n--- LIST RUNS ---")
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/runs")
-        assert response.status_code == 200
-        runs = response.json()
-        print(f"✓ Listed runs: {len(runs)} found")
+    response = await client.get("/runs")
+    assert response.status_code == 200
+    runs = response.json()
+    print(f"✓ Listed runs: {len(runs)} found")
 
 
 async def main():
@@ -176,10 +222,13 @@ async def main():
     print(f"Server: {BASE_URL}")
     
     try:
-        await test_health()
-        workflow_id = await test_workflow_crud()
-        await test_workflow_execution(workflow_id)
-        await test_list_runs()
+        # One client (one connection pool) shared by every test
+        async with httpx.AsyncClient(base_url=BASE_URL) as client:
+            await test_health(client)
+            workflow_id = await test_workflow_crud(client)
+            await test_workflow_execution(client, workflow_id)
+            await test_invalid_dependencies(client)
+            await test_list_runs(client)
         
         print("\n" + "=" * 60)
         print("✅ All API tests passed!")
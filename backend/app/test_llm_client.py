@@ -9,6 +9,7 @@ This validates:
 3. System prompts are respected
 4. Token usage is returned
 5. Errors are handled gracefully
+6. The shared client and semaphore work across event loops
 """
 
 import asyncio
@@ -16,12 +17,16 @@ import os
 import sys
 from pathlib import Path
 
+import httpx
+import orjson
+
 # Allow running as: `python backend/app/test_llm_client.py`
 # by ensuring the backend root (which contains the `app` package) is on sys.path.
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
+from app import llm_client
 from app.llm_client import UnboundLLMClient, UnboundAPIError, create_unbound_client
 from app.models import ModelName
 
@@ -118,12 +123,94 @@ async def test_invalid_api_key():
         assert e.status_code in [401, 403, None], f"Expected 401/403, got {e.status_code}"
 
 
+async def test_streaming_offline():
+    """Test SSE parsing, the usage frame and 429 retry against a mock transport."""
+    print("\n--- STREAMING (offline) ---")
+    
+    sse = (
+        b": keep-alive comment\n\n"
+        b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+        b'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        b'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+        b'data: {"choices": [], "usage": {"prompt_tokens": 7, "completion_tokens": 2}}\n\n'
+        b"data: [DONE]\n\n"
+    )
+    requests: list[httpx.Request] = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, content=sse, headers={"Content-Type": "text/event-stream"})
+    
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        client = UnboundLLMClient(api_key="test-key", http_client=http_client)
+        
+        usage: dict = {}
+        deltas = [d async for d in client.stream(ModelName.KIMI_K2_INSTRUCT, "Hi", usage=usage)]
+        assert deltas == ["Hel", "lo"], deltas
+        assert usage == {"prompt_tokens": 7, "completion_tokens": 2}, usage
+        assert len(requests) == 2, "Expected one retry after 429"
+        body = orjson.loads(requests[-1].content)
+        assert body["stream"] is True and body["stream_options"] == {"include_usage": True}
+        print("✓ Deltas and usage parsed; 429 retried")
+        
+        requests.clear()
+        chunks: list[str] = []
+        response = await client.call(ModelName.KIMI_K2_INSTRUCT, "Hi", on_chunk=chunks.append)
+        assert response.content == "Hello" and chunks == ["Hel", "lo"]
+        assert (response.prompt_tokens, response.completion_tokens) == (7, 2)
+        print("✓ call(on_chunk=...) returns the joined stream")
+    
+    def error_handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(401, json={"error": {"message": "bad key"}})
+    
+    async with httpx.AsyncClient(transport=httpx.MockTransport(error_handler)) as http_client:
+        client = UnboundLLMClient(api_key="test-key", http_client=http_client)
+        try:
+            [d async for d in client.stream(ModelName.KIMI_K2_INSTRUCT, "Hi")]
+            assert False, "Should have raised UnboundAPIError"
+        except UnboundAPIError as e:
+            assert e.status_code == 401 and "bad key" in e.message
+        print("✓ Non-200 stream raises UnboundAPIError")
+
+
+def test_per_loop_state():
+    """Test that the shared client and semaphore survive repeated asyncio.run()."""
+    print("\n--- PER-LOOP CLIENT / SEMAPHORE ---")
+    
+    async def contend_and_get_client() -> httpx.AsyncClient:
+        # One more task than MAX_CONCURRENCY so one has to wait (binds the loop)
+        async def hold():
+            async with llm_client._llm_semaphore():
+                await asyncio.sleep(0)
+        await asyncio.gather(*(hold() for _ in range(llm_client.MAX_CONCURRENCY + 1)))
+        return await llm_client.get_client()
+    
+    first = asyncio.run(contend_and_get_client())
+    second = asyncio.run(contend_and_get_client())
+    assert first is not second, "Each event loop should get its own pooled client"
+    print("✓ Second asyncio.run() gets a fresh semaphore and client")
+    
+    async def close_and_check():
+        client = await llm_client.get_client()
+        await llm_client.close_client()
+        assert client.is_closed and await llm_client.get_client() is not client
+        await llm_client.close_client()
+    
+    asyncio.run(close_and_check())
+    print("✓ close_client() closes and forgets the loop's client")
+
+
 async def main():
     """Run all LLM client tests."""
     print("=" * 60)
     print("UNBOUND LLM CLIENT TESTS")
     print("=" * 60)
     
+    # Offline: no API key needed
+    await test_streaming_offline()
+    
     # Check API key is set
     api_key = os.getenv("UNBOUND_API_KEY")
     if not api_key:
@@ -155,4 +242,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    test_per_loop_state()  # Runs its own event loops
     asyncio.run(main())
@@ -18,12 +18,15 @@ from app.models import (
     EventType,
     ExecutionEvent,
     ModelName,
+    RunStatus,
     Step,
     ValidationRule,
     ValidationType,
     Workflow,
 )
-from app.orchestrator import create_orchestrator
+from app.checkpoint import InMemoryCheckpointStore
+from app.llm_cache import LLMCache
+from app.orchestrator import LLMResponse, ValidationResult, create_orchestrator
 
 
 def main():
@@ -100,5 +103,345 @@ def main():
     print("\n✅ All assertions passed!")
 
 
+class SlowLLMClient:
+    """LLM stub that sleeps per call and records peak concurrency."""
+    
+    def __init__(self, delay: float = 0.05, prefix: str = "out"):
+        self.delay = delay
+        self.prefix = prefix
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+    
+    async def call(self, model, prompt, system_prompt=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return LLMResponse(content=f"{self.prefix}:{prompt}", prompt_tokens=1, completion_tokens=1)
+
+
+def test_parallel_steps():
+    """Context-free steps run alongside their predecessor when enabled."""
+    print("\n--- PARALLEL STEPS ---")
+    
+    workflow = Workflow(
+        name="Parallel Workflow",
+        steps=[
+            Step(name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a"),
+            Step(name="B", order=1, model=ModelName.KIMI_K2P5, prompt="b"),
+            Step(name="C", order=2, model=ModelName.KIMI_K2P5, prompt="c {{context}}"),
+        ],
+    )
+    
+    llm = SlowLLMClient()
+    orchestrator = create_orchestrator(llm_client=llm, parallel_steps=True)
+    run = asyncio.run(orchestrator.run(workflow))
+    
+    assert run.status.value == "completed", run.failure_reason
+    assert llm.peak == 2, f"Expected A and B to overlap, peak={llm.peak}"
+    # C still sees the output of the last step in the preceding batch
+    assert run.final_output == "out:c out:b", run.final_output
+    print("✓ Context-free steps overlap; context order preserved")
+    
+    # A failing step skips everything after its batch
+    workflow = Workflow(
+        name="Parallel Failure",
+        steps=[
+            Step(
+                name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a", max_retries=0,
+                validations=[ValidationRule(type=ValidationType.CONTAINS, expected="nope")],
+            ),
+            Step(name="B", order=1, model=ModelName.KIMI_K2P5, prompt="b"),
+            Step(name="C", order=2, model=ModelName.KIMI_K2P5, prompt="c {{context}}"),
+        ],
+    )
+    run = asyncio.run(create_orchestrator(llm_client=SlowLLMClient(), parallel_steps=True).run(workflow))
+    statuses = [run.step_runs[s.id].status.value for s in workflow.steps]
+    assert run.status.value == "failed"
+    assert statuses == ["failed", "passed", "skipped"], statuses
+    print("✓ Failure in a batch skips later steps")
+
+
+
+def test_speculative_prefetch():
+    """A context-free step's LLM call overlaps the previous step; failure cancels it."""
+    print("\n--- SPECULATIVE PREFETCH ---")
+    
+    steps = [
+        Step(name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a", max_retries=0),
+        Step(name="B", order=1, model=ModelName.KIMI_K2P5, prompt="b"),
+        Step(name="C", order=2, model=ModelName.KIMI_K2P5, prompt="c {{context}}"),
+    ]
+    llm = SlowLLMClient()
+    run = asyncio.run(create_orchestrator(llm_client=llm, speculative=True).run(Workflow(name="Spec", steps=steps)))
+    assert run.status.value == "completed", run.failure_reason
+    assert llm.peak == 2 and llm.calls == 3, (llm.peak, llm.calls)
+    assert run.final_output == "out:c out:b", run.final_output
+    print("✓ Next step's call sent while the previous step runs")
+    
+    steps[0] = steps[0].model_copy(update={
+        "validations": [ValidationRule(type=ValidationType.CONTAINS, expected="nope")],
+    })
+    workflow = Workflow(name="Spec Failure", steps=steps)
+    run = asyncio.run(create_orchestrator(llm_client=SlowLLMClient(), speculative=True).run(workflow))
+    statuses = [run.step_runs[s.id].status.value for s in workflow.steps]
+    assert statuses == ["failed", "skipped", "skipped"], statuses
+    print("✓ Failure discards the prefetched call")
+
+
+def test_run_many():
+    """Independent workflows run concurrently, bounded by max_concurrency."""
+    print("\n--- RUN MANY ---")
+    
+    workflows = [
+        Workflow(
+            name=f"W{i}",
+            steps=[Step(name="A", order=0, model=ModelName.KIMI_K2P5, prompt=f"w{i}")],
+        )
+        for i in range(5)
+    ]
+    llm = SlowLLMClient()
+    runs = asyncio.run(create_orchestrator(llm_client=llm).run_many(workflows, max_concurrency=3))
+    
+    assert [r.final_output for r in runs] == [f"out:w{i}" for i in range(5)]
+    assert llm.peak == 3, f"Expected 3 concurrent runs, peak={llm.peak}"
+    print("✓ Runs overlap up to max_concurrency, results in order")
+
+
+class StreamingLLMClient:
+    """LLM stub whose stream() yields fixed tokens and records how many were read."""
+    
+    def __init__(self, tokens: list[str]):
+        self.tokens = tokens
+        self.yielded = 0
+    
+    async def call(self, model, prompt, system_prompt=None):
+        return LLMResponse(content="".join(self.tokens))
+    
+    async def stream(self, model, prompt, system_prompt=None, usage=None):
+        for token in self.tokens:
+            self.yielded += 1
+            yield token
+
+
+def test_early_stop():
+    """CONTAINS-only steps stop streaming once every expected substring appeared."""
+    print("\n--- EARLY STOP ---")
+    
+    step = Step(
+        name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a",
+        validations=[
+            ValidationRule(type=ValidationType.CONTAINS, expected="def "),
+            ValidationRule(type=ValidationType.CONTAINS, expected="return"),
+        ],
+    )
+    llm = StreamingLLMClient(["de", "f f():", " ret", "urn 1", "\n# trailing", " text"])
+    run = asyncio.run(create_orchestrator(llm_client=llm, early_stop=True).run(
+        Workflow(name="Early Stop", steps=[step])
+    ))
+    
+    assert run.status.value == "completed", run.failure_reason
+    assert run.final_output == "def f(): return 1", run.final_output
+    assert llm.yielded == 4, f"Expected the stream to stop after 4 tokens, read {llm.yielded}"
+    print("✓ Stream closed as soon as the rules were satisfied")
+
+
+def test_checkpoint_resume():
+    """A resumed run continues after the last passed step instead of starting over."""
+    print("\n--- CHECKPOINT / RESUME ---")
+    
+    workflow = Workflow(
+        name="Resumable",
+        steps=[
+            Step(name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a"),
+            Step(name="B", order=1, model=ModelName.KIMI_K2P5, prompt="b {{context}}"),
+            Step(
+                name="C", order=2, model=ModelName.KIMI_K2P5, prompt="c {{context}}", max_retries=0,
+                validations=[ValidationRule(type=ValidationType.CONTAINS, expected="out:c")],
+            ),
+        ],
+    )
+    store = InMemoryCheckpointStore()
+    failed = asyncio.run(create_orchestrator(
+        llm_client=SlowLLMClient(delay=0, prefix="bad"), checkpoint=store,
+    ).run(workflow))
+    assert failed.status.value == "failed"
+    
+    llm = SlowLLMClient(delay=0)
+    resumed = asyncio.run(create_orchestrator(
+        llm_client=llm, checkpoint=store,
+    ).resume(workflow, failed.id))
+    
+    assert resumed.status.value == "completed", resumed.failure_reason
+    assert llm.calls == 1, f"Expected only step C to re-run, calls={llm.calls}"
+    assert resumed.final_output == "out:c bad:b bad:a", resumed.final_output
+    assert len(resumed.step_runs) == 3
+    print("✓ Resume skips checkpointed steps")
+    
+    assert asyncio.run(store.load(failed.id)) is None, "Completed run kept its checkpoint"
+    print("✓ Checkpoint deleted once the run completes")
+
+
+def test_async_event_sink():
+    """Async on_event is drained in order by run()'s end; a full queue drops events."""
+    print("\n--- ASYNC EVENT SINK ---")
+    
+    workflow = Workflow(
+        name="Async Sink",
+        steps=[
+            Step(name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a"),
+            Step(name="B", order=1, model=ModelName.KIMI_K2P5, prompt="b {{context}}"),
+        ],
+    )
+    received: list[ExecutionEvent] = []
+    
+    async def slow_sink(event: ExecutionEvent) -> None:
+        await asyncio.sleep(0.001)
+        received.append(event)
+    
+    orchestrator = create_orchestrator(llm_client=SlowLLMClient(delay=0), on_event=slow_sink)
+    asyncio.run(orchestrator.run(workflow))
+    
+    assert received[0].event == EventType.RUN_STARTED
+    assert received[-1].event == EventType.RUN_COMPLETED
+    assert orchestrator.dropped_events == 0
+    print(f"✓ All {len(received)} events delivered in order before run() returned")
+    
+    total = len(received)
+    received.clear()
+    orchestrator = create_orchestrator(
+        llm_client=SlowLLMClient(delay=0), on_event=slow_sink, event_queue_size=2,
+    )
+    asyncio.run(orchestrator.run(workflow))
+    assert orchestrator.dropped_events > 0
+    assert len(received) + orchestrator.dropped_events == total
+    outcomes = [e.event for e in received if e.event in (EventType.STEP_COMPLETED, EventType.RUN_COMPLETED)]
+    assert outcomes == [EventType.STEP_COMPLETED, EventType.STEP_COMPLETED, EventType.RUN_COMPLETED]
+    assert received[-1].event == EventType.RUN_COMPLETED
+    print(f"✓ Bounded queue dropped {orchestrator.dropped_events} events, no step/run outcomes")
+
+
+def test_dag():
+    """Steps with depends_on run as soon as their dependencies pass."""
+    print("\n--- DAG ---")
+    
+    a = Step(name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a", depends_on=[])
+    b = Step(name="B", order=1, model=ModelName.KIMI_K2P5, prompt="b {{context}}", depends_on=[a.id])
+    c = Step(name="C", order=2, model=ModelName.KIMI_K2P5, prompt="c {{context}}", depends_on=[a.id])
+    d = Step(name="D", order=3, model=ModelName.KIMI_K2P5, prompt="d {{context}}", depends_on=[b.id, c.id])
+    
+    llm = SlowLLMClient()
+    run = asyncio.run(create_orchestrator(llm_client=llm).run(Workflow(name="Diamond", steps=[a, b, c, d])))
+    assert run.status.value == "completed", run.failure_reason
+    assert llm.peak == 2, f"Expected B and C to overlap, peak={llm.peak}"
+    assert run.final_output == "out:d out:b out:a\n\nout:c out:a", run.final_output
+    print("✓ Independent branches overlap; joins see every dependency")
+    
+    b = b.model_copy(update={
+        "max_retries": 0,
+        "validations": [ValidationRule(type=ValidationType.CONTAINS, expected="nope")],
+    })
+    workflow = Workflow(name="Diamond Failure", steps=[a, b, c, d])
+    run = asyncio.run(create_orchestrator(llm_client=SlowLLMClient()).run(workflow))
+    statuses = [run.step_runs[s.id].status.value for s in workflow.steps]
+    assert statuses == ["passed", "failed", "passed", "skipped"], statuses
+    print("✓ Failure skips dependents; in-flight branches still finish")
+
+
+def test_llm_cache():
+    """A rerun reuses validated outputs; rejected outputs are never cached."""
+    print("\n--- LLM CACHE ---")
+    
+    workflow = Workflow(
+        name="Cached Workflow",
+        steps=[
+            Step(name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a"),
+            Step(name="B", order=1, model=ModelName.KIMI_K2P5, prompt="b {{context}}"),
+        ],
+    )
+    llm = SlowLLMClient(delay=0)
+    orchestrator = create_orchestrator(llm_client=llm, cache=LLMCache())
+    first = asyncio.run(orchestrator.run(workflow))
+    second = asyncio.run(orchestrator.run(workflow))
+    
+    assert llm.calls == 2, f"Expected only the first run to call the LLM, calls={llm.calls}"
+    assert (orchestrator.cache_hits, orchestrator.cache_misses) == (2, 2)
+    assert second.final_output == first.final_output == "out:b out:a"
+    assert second.total_cost_usd == 0.0
+    print("✓ Second run served from cache")
+    
+    failing = Workflow(
+        name="Cached Failure",
+        steps=[
+            Step(
+                name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a", max_retries=1,
+                validations=[ValidationRule(type=ValidationType.CONTAINS, expected="nope")],
+            ),
+        ],
+    )
+    llm = SlowLLMClient(delay=0)
+    cache = LLMCache()
+    asyncio.run(create_orchestrator(llm_client=llm, cache=cache).run(failing))
+    assert llm.calls == 2 and len(cache) == 0
+    print("✓ Rejected outputs are not cached")
+
+
+class RaisingJudgeValidator:
+    """Passes local rules; raises on LLM_JUDGE, like a validator whose judge call crashed."""
+    
+    async def validate(self, output, rule, llm_client=None):
+        if rule.type == ValidationType.LLM_JUDGE:
+            raise RuntimeError("judge exploded")
+        return ValidationResult(passed=True)
+
+
+def test_validator_exceptions():
+    """A raising validator fails the attempt (and retries) whatever the rule count."""
+    print("\n--- VALIDATOR EXCEPTIONS ---")
+    
+    judge = ValidationRule(type=ValidationType.LLM_JUDGE, criteria="Is it good?")
+    for judges in (1, 2):
+        workflow = Workflow(
+            name=f"{judges} judge(s)",
+            steps=[
+                Step(
+                    name="A", order=0, model=ModelName.KIMI_K2P5, prompt="a", max_retries=1,
+                    validations=[judge] * judges,
+                ),
+            ],
+        )
+        llm = SlowLLMClient(delay=0)
+        run = asyncio.run(create_orchestrator(llm_client=llm, validator=RaisingJudgeValidator()).run(workflow))
+        assert run.status == RunStatus.FAILED, run.status
+        assert llm.calls == 2, f"Expected a retry with {judges} judge(s), calls={llm.calls}"
+        assert "judge exploded" in run.failure_reason, run.failure_reason
+    print("✓ Validator exceptions are retryable failures with 1 or 2 remote rules")
+
+
+def test_model_copy():
+    """Copies made with model_copy(update=...) use their own prompt."""
+    print("\n--- MODEL COPY ---")
+    
+    step = Step(name="A", order=0, model=ModelName.KIMI_K2P5, prompt="old {{context}}")
+    copied = step.model_copy(update={"prompt": "new {{context}}"})
+    assert copied.render_prompt("X") == "new X", copied.render_prompt("X")
+    
+    plain = step.model_copy(update={"prompt": "no placeholder"})
+    assert not plain.reads_context and plain.render_prompt("X") == "no placeholder"
+    print("✓ Copied step renders its updated prompt")
+
+
 if __name__ == "__main__":
     main()
+    test_parallel_steps()
+    test_speculative_prefetch()
+    test_run_many()
+    test_early_stop()
+    test_checkpoint_resume()
+    test_async_event_sink()
+    test_dag()
+    test_llm_cache()
+    test_model_copy()
+    test_validator_exceptions()
@@ -14,9 +14,12 @@ import asyncio
 import os
 
 from app.models import ValidationRule, ValidationType
+from app.orchestrator import LLMResponse
 from app.validators import (
+    MAX_OUTPUT_LEN,
     ValidatorDispatcher,
     validate_contains,
+    validate_contains_many,
     validate_json,
     validate_python_syntax,
     validate_regex_match,
@@ -48,6 +51,13 @@ def test_python_syntax():
     result = validate_python_syntax("   \n\t  ")
     assert not result.passed, "Expected fail for whitespace-only"
     print(f"✓ Whitespace-only fails: {result.error}")
+    
+    # Oversized output is rejected without parsing
+    result = validate_python_syntax("x = 1\n" * (MAX_OUTPUT_LEN // 6 + 1))
+    assert not result.passed and "too large" in result.error
+    result = validate_regex_match("a" * (MAX_OUTPUT_LEN + 1), r"a+b")
+    assert not result.passed and "too large" in result.error
+    print("✓ Oversized output fails up front")
 
 
 def test_json_valid():
@@ -79,6 +89,19 @@ def test_json_valid():
     result = validate_json("")
     assert not result.passed, "Expected fail for empty input"
     print(f"✓ Empty input fails: {result.error}")
+    
+    # Fast parsers must not change json's verdicts
+    result = validate_json("12345678901234567890123")
+    assert result.passed, f"Expected pass for big integer, got: {result.error}"
+    print("✓ Integer beyond 64 bits passes")
+    
+    result = validate_json("\ufeff[1]")
+    assert not result.passed, "Expected fail for leading BOM (json rejects it)"
+    print(f"✓ Leading BOM fails: {result.error}")
+    
+    result = validate_json("[" * 5000 + "]" * 5000)
+    assert result.passed or "nested" in result.error, result.error
+    print("✓ Deep nesting doesn't raise")
 
 
 def test_contains():
@@ -106,6 +129,15 @@ def test_contains():
     assert not result.passed, "Expected fail for missing expected"
     assert "required" in result.error.lower()
     print(f"✓ Missing config fails: {result.error}")
+    
+    # Many needles at once (automaton path when pyahocorasick is installed)
+    needles = [f"word{i} " for i in range(20)] + ["missing", None]
+    output = " ".join(f"word{i}" for i in range(20)) + " "
+    results = validate_contains_many(output, needles)
+    assert [r.passed for r in results] == [True] * 20 + [False, False]
+    assert "missing" in results[20].error and "required" in results[21].error
+    assert [r.passed for r in validate_contains_many("a b", ["a", "c"])] == [True, False]
+    print("✓ validate_contains_many matches per-needle results")
 
 
 def test_regex_match():
@@ -139,6 +171,33 @@ def test_regex_match():
     assert not result.passed, "Expected fail for missing pattern"
     assert "required" in result.error.lower()
     print(f"✓ Missing config fails: {result.error}")
+    
+    # Plain-text patterns (str fast path) keep re's anchor semantics
+    for pattern, output, expected in [
+        ("DONE", "all DONE here", True),
+        ("^Answer:", "Answer: 42", True),
+        ("^Answer:", "My Answer: 42", False),
+        ("DONE$", "work DONE\n", True),  # $ matches before a final newline
+        ("DONE$", "DONE later", False),
+        ("^ok$", "ok\n", True),
+        (r"^\d+$", "123\n", True),  # Not plain text: must not lose re's $ either
+    ]:
+        assert validate_regex_match(output, pattern).passed == expected, (pattern, output)
+    print("✓ Literal and $-anchored patterns match like re.search")
+
+    # \d, \w, \s, \b and negations match Unicode, as in re (RE2's are ASCII-only)
+    for pattern, output, expected in [
+        (r"\bcafé\b", "un café!", True),
+        (r"^\d+", "٣٤", True),
+        (r"^\s+x", "\xa0x", True),
+        (r"^\w+!", "ça!", True),
+        (r"^\D", "٣", False),
+        (r"^\S", "\xa0", False),
+        (r"^\W", "é", False),
+        (r"a\Bé", "aé", True),
+    ]:
+        assert validate_regex_match(output, pattern).passed == expected, (pattern, output)
+    print("✓ Unicode \\d/\\w/\\s/\\b classes match like re.search")
 
 
 def test_test_exec():
@@ -281,12 +340,53 @@ async def test_dispatcher():
     assert result.passed, f"Expected pass, got: {result.error}"
     print("✓ REGEX_MATCH routed correctly")
     
+    # A copied rule matches against its own pattern
+    copied = rule.model_copy(update={"pattern": r"^[a-z]+$"})
+    assert not (await dispatcher.validate("value: 123", copied)).passed
+    print("✓ model_copy'd REGEX_MATCH uses the updated pattern")
+    
     # TEST_EXEC via dispatcher
     rule = ValidationRule(type=ValidationType.TEST_EXEC, test_code="assert 'code' in output")
     result = await dispatcher.validate("some code here", rule)
     assert result.passed, f"Expected pass, got: {result.error}"
     print("✓ TEST_EXEC routed correctly")
     
+    # Long outputs: RE2 searches move to a worker thread, same verdicts
+    rule = ValidationRule(type=ValidationType.REGEX_MATCH, pattern=r"(a|b)+c")
+    assert (await dispatcher.validate("a" * 200_000 + "c", rule)).passed
+    assert not (await dispatcher.validate("a" * 200_000, rule)).passed
+    print("✓ Long outputs validated off the event loop")
+    
+    # validate_sync: same result without a coroutine; LLM_JUDGE is refused
+    rule = ValidationRule(type=ValidationType.CONTAINS, expected="hello")
+    assert dispatcher.validate_sync("hello world", rule).passed
+    assert not dispatcher.validate_sync("goodbye", rule).passed
+    try:
+        dispatcher.validate_sync("x", ValidationRule(type=ValidationType.LLM_JUDGE, criteria="?"))
+        assert False, "Expected ValueError for LLM_JUDGE"
+    except ValueError:
+        pass
+    print("✓ validate_sync runs local rules, refuses LLM_JUDGE")
+    
+    # validate_many: one result per rule, in rule order
+    rules = [
+        ValidationRule(type=ValidationType.CONTAINS, expected="x"),
+        ValidationRule(type=ValidationType.PYTHON_SYNTAX),
+        ValidationRule(type=ValidationType.CONTAINS, expected="nope"),
+        ValidationRule(type=ValidationType.LLM_JUDGE, criteria="Is it good?"),
+    ]
+    llm = CountingJudgeClient()
+    results = await dispatcher.validate_many("x = 'good'", rules[:2] + rules[3:], llm)
+    assert [r.passed for r in results] == [True, True, True]
+    print("✓ validate_many returns results in rule order")
+    
+    # A failing local rule stops the list before any judge is paid for
+    llm = CountingJudgeClient()
+    results = await dispatcher.validate_many("x = 'good'", rules, llm)
+    assert [r and r.passed for r in results] == [True, True, False, None]
+    assert llm.calls == 0, f"Judge called after a local failure ({llm.calls} calls)"
+    print("✓ validate_many skips judges after a local failure")
+    
     # LLM_JUDGE via dispatcher (skip if no API key)
     if os.getenv("UNBOUND_API_KEY"):
         from app.llm_client import create_unbound_client
@@ -299,6 +399,49 @@ async def test_dispatcher():
         print("⚠️  LLM_JUDGE dispatcher test skipped (no API key)")
 
 
+class CountingJudgeClient:
+    """Answers YES to outputs containing "good"; one numbered line per output when batched."""
+    
+    def __init__(self, garble: bool = False):
+        self.calls = 0
+        self.garble = garble
+    
+    async def call(self, model, prompt, system_prompt=None, **kwargs):
+        self.calls += 1
+        outputs = [part.split("\n", 1)[0] for part in prompt.split("OUTPUT TO EVALUATE:\n")[1:]]
+        answers = ["YES" if "good" in o else "NO" for o in outputs]
+        if self.garble:
+            content = "I can't answer that"
+        elif len(answers) == 1:
+            content = answers[0]
+        else:
+            content = "\n".join(f"{n}: {a}" for n, a in enumerate(answers, start=1))
+        return LLMResponse(content=content)
+
+
+async def test_judge_batching():
+    """Test that concurrent LLM_JUDGE validations share one LLM call."""
+    print("\n--- JUDGE BATCHING ---")
+    
+    rule = ValidationRule(type=ValidationType.LLM_JUDGE, criteria="Is it good?")
+    outputs = ["good one", "bad one", "good two", "bad two"]
+    
+    llm = CountingJudgeClient()
+    dispatcher = ValidatorDispatcher(batch_judges=True)
+    results = await asyncio.gather(*(dispatcher.validate(o, rule, llm) for o in outputs))
+    assert [r.passed for r in results] == [True, False, True, False]
+    assert llm.calls == 1, f"Expected 1 batched call, got {llm.calls}"
+    print("✓ 4 concurrent judges answered by 1 LLM call")
+    
+    # An unparseable batched answer falls back to one call per output
+    llm = CountingJudgeClient(garble=True)
+    results = await asyncio.gather(*(dispatcher.validate(o, rule, llm) for o in outputs[:2]))
+    assert not any(r.passed for r in results)
+    assert all("unclear" in r.error for r in results)
+    assert llm.calls == 3, f"Expected 1 batched + 2 single calls, got {llm.calls}"
+    print("✓ Unparseable batch answer re-judged one by one")
+
+
 def main():
     """Run all validator tests."""
     print("=" * 60)
@@ -314,6 +457,7 @@ def main():
     async def run_async_tests():
         await test_llm_judge()
         await test_dispatcher()
+        await test_judge_batching()
     
     asyncio.run(run_async_tests())
     
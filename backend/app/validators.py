@@ -12,12 +12,48 @@ HOW IT PLUGS INTO ORCHESTRATOR:
 """
 
 import ast
+import asyncio
 import json
 import re
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import CodeType, MappingProxyType
+from typing import Callable, Optional, Sequence
+
+import orjson
+
+try:
+    import simdjson
+except ImportError:  # Optional: orjson is used instead
+    simdjson = None
+
+try:
+    import ahocorasick
+except ImportError:  # Optional: CONTAINS needles are searched one by one
+    ahocorasick = None
 
 from .models import ValidationRule, ValidationType, ModelName
 from .orchestrator import LLMClient, ValidationResult
+from .patterns import compile_pattern, releases_gil
+
+
+_json_parsers = threading.local()
+
+# Outputs longer than this fail PYTHON_SYNTAX and REGEX_MATCH without being parsed.
+# WHY: ast.parse on a multi-MB output can take seconds and hundreds of MB,
+# and a backtracking (non-RE2) pattern's worst case grows with the input.
+# Real LLM outputs are bounded by max_tokens, far below this.
+MAX_OUTPUT_LEN = 1 << 20
+
+
+def _too_large(output: str, what: str) -> Optional[ValidationResult]:
+    if len(output) > MAX_OUTPUT_LEN:
+        return ValidationResult(
+            passed=False,
+            error=f"Output too large for {what} validation ({len(output)} > {MAX_OUTPUT_LEN} chars)",
+        )
+    return None
 
 
 # =============================================================================
@@ -32,6 +68,10 @@ def validate_python_syntax(output: str) -> ValidationResult:
             error="Empty output cannot be valid Python syntax",
         )
     
+    too_large = _too_large(output, "Python syntax")
+    if too_large is not None:
+        return too_large
+    
     try:
         ast.parse(output)
         return ValidationResult(passed=True)
@@ -44,6 +84,44 @@ def validate_python_syntax(output: str) -> ValidationResult:
         )
 
 
+def _fast_json_valid(output: str) -> bool:
+    """
+    True if a fast parser accepts `output`; False means "ask json".
+    
+    WHY simdjson first: it validates without building Python objects,
+    ~2.5-7x faster than orjson (which is ~2x faster than json). Both are
+    stricter than json (NaN/Infinity, lone surrogates), hence False is not
+    a verdict.
+    
+    Exceptions to "stricter", handled here:
+    - simdjson skips a leading BOM, which json rejects; such output never
+      takes the fast path.
+    - simdjson raises RuntimeError (not ValueError) for valid documents past
+      its limits (integers beyond 64 bits, deep nesting); orjson decides.
+    """
+    if output.startswith("\ufeff"):
+        return False
+    
+    if simdjson is not None:
+        # simdjson.Parser isn't thread-safe; keep one per thread
+        parser = getattr(_json_parsers, "parser", None)
+        if parser is None:
+            parser = _json_parsers.parser = simdjson.Parser()
+        try:
+            parser.parse(output.encode())
+            return True
+        except ValueError:  # Includes UnicodeEncodeError
+            return False
+        except RuntimeError:
+            pass  # BIGINT_ERROR, DEPTH_ERROR, ...: fall through to orjson
+    
+    try:
+        orjson.loads(output)
+        return True
+    except orjson.JSONDecodeError:
+        return False
+
+
 def validate_json(output: str) -> ValidationResult:
     # Handle empty output
     if not output or not output.strip():
@@ -52,6 +130,11 @@ def validate_json(output: str) -> ValidationResult:
             error="Empty output cannot be valid JSON",
         )
     
+    # Fast path in C; a rejection is re-checked with json below, which is
+    # authoritative and keeps the error message format.
+    if _fast_json_valid(output):
+        return ValidationResult(passed=True)
+    
     try:
         json.loads(output)
         return ValidationResult(passed=True)
@@ -60,6 +143,11 @@ def validate_json(output: str) -> ValidationResult:
             passed=False,
             error=f"JSON parse error at position {e.pos}: {e.msg}",
         )
+    except RecursionError:
+        return ValidationResult(
+            passed=False,
+            error="JSON parse error: nested too deeply",
+        )
 
 
 def validate_contains(output: str, expected: str) -> ValidationResult:
@@ -89,6 +177,8 @@ def validate_contains(output: str, expected: str) -> ValidationResult:
             error="ValidationRule.expected is required for CONTAINS validation",
         )
     
+    # WHY `in`: str.find() and a len() pre-check were both measured slower;
+    # `in` already rejects a longer needle in C before searching
     if expected in output:
         return ValidationResult(passed=True)
     else:
@@ -100,9 +190,51 @@ def validate_contains(output: str, expected: str) -> ValidationResult:
         )
 
 
+# Needles from which one Aho-Corasick pass beats one `in` per needle
+# (measured crossover on ~2 KB outputs is around 10-20 needles)
+CONTAINS_AUTOMATON_MIN = 12
+
+
+@lru_cache(maxsize=128)
+def _contains_automaton(needles: tuple[str, ...]) -> "ahocorasick.Automaton":
+    automaton = ahocorasick.Automaton()
+    for needle in needles:
+        automaton.add_word(needle, needle)
+    automaton.make_automaton()
+    return automaton
+
+
+def validate_contains_many(
+    output: str,
+    expected: Sequence[Optional[str]],
+) -> list[ValidationResult]:
+    """
+    validate_contains for several substrings; one result per entry of `expected`.
+    
+    WHY: With many CONTAINS rules, each `in` rescans the output. With
+    pyahocorasick installed and at least CONTAINS_AUTOMATON_MIN needles, a
+    single automaton pass finds them all. Below that, or without it, the
+    per-needle `in` is faster. Needles that aren't found go through
+    validate_contains for the error message.
+    """
+    needles = tuple(dict.fromkeys(e for e in expected if e))
+    if ahocorasick is None or len(needles) < CONTAINS_AUTOMATON_MIN:
+        return [validate_contains(output, e) for e in expected]
+    
+    found = {needle for _, needle in _contains_automaton(needles).iter(output)}
+    return [
+        ValidationResult(passed=True) if e in found else validate_contains(output, e)
+        for e in expected
+    ]
+
+
 def validate_regex_match(output: str, pattern: str) -> ValidationResult:
     """
-    Check if output matches a regex pattern using re.search().
+    Check if output matches a regex pattern, with re.search() semantics.
+    
+    The pattern is compiled by patterns.compile_pattern: plain text uses str
+    methods, most other patterns run on RE2 when installed (linear time;
+    ASCII-only \\d/\\w/\\b), and the rest on re.
     
     WHY re.search (not re.match):
     - re.search finds pattern anywhere in string
@@ -127,8 +259,13 @@ def validate_regex_match(output: str, pattern: str) -> ValidationResult:
             error="ValidationRule.pattern is required for REGEX_MATCH validation",
         )
     
+    too_large = _too_large(output, "regex")
+    if too_large is not None:
+        return too_large
+    
     try:
-        if re.search(pattern, output):
+        regex = compile_pattern(pattern)
+        if regex.search(output):
             return ValidationResult(passed=True)
         else:
             output_preview = output[:100] + "..." if len(output) > 100 else output
@@ -144,6 +281,56 @@ def validate_regex_match(output: str, pattern: str) -> ValidationResult:
         )
 
 
+# Restricted builtins for test_code
+# WHY restricted: Prevent access to dangerous builtins
+# WHY module-level + read-only: built once instead of per call, and test_code
+# can't modify it for later calls
+_SAFE_BUILTINS = MappingProxyType({
+    "len": len,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "tuple": tuple,
+    "set": set,
+    "range": range,
+    "enumerate": enumerate,
+    "zip": zip,
+    "map": map,
+    "filter": filter,
+    "sorted": sorted,
+    "reversed": reversed,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "isinstance": isinstance,
+    "hasattr": hasattr,
+    "getattr": getattr,
+    "True": True,
+    "False": False,
+    "None": None,
+    # Allow json for structured output testing
+    "json": json,
+})
+
+
+@lru_cache(maxsize=256)
+def _compile_test_code(test_code: str) -> CodeType:
+    """
+    Compile test_code once; the same rule runs against every attempt's output.
+    
+    WHY optimize=0: test_code is assertions. Higher levels (and `python -O`,
+    which exec(str) would inherit) strip assert statements, so every test
+    would pass. SyntaxError propagates and is never cached.
+    """
+    return compile(test_code, "<test_code>", "exec", dont_inherit=True, optimize=0)
+
+
 def validate_test_exec(output: str, test_code: str) -> ValidationResult:
     """
     Execute test code against the LLM output in a sandboxed environment.
@@ -176,48 +363,23 @@ def validate_test_exec(output: str, test_code: str) -> ValidationResult:
             error="ValidationRule.test_code is required for TEST_EXEC validation",
         )
     
-    # Create a restricted execution environment
-    # WHY restricted: Prevent access to dangerous builtins
-    safe_builtins = {
-        "len": len,
-        "str": str,
-        "int": int,
-        "float": float,
-        "bool": bool,
-        "list": list,
-        "dict": dict,
-        "tuple": tuple,
-        "set": set,
-        "range": range,
-        "enumerate": enumerate,
-        "zip": zip,
-        "map": map,
-        "filter": filter,
-        "sorted": sorted,
-        "reversed": reversed,
-        "min": min,
-        "max": max,
-        "sum": sum,
-        "abs": abs,
-        "all": all,
-        "any": any,
-        "isinstance": isinstance,
-        "hasattr": hasattr,
-        "getattr": getattr,
-        "True": True,
-        "False": False,
-        "None": None,
-        # Allow json for structured output testing
-        "json": json,
-    }
+    try:
+        code = _compile_test_code(test_code)
+    except SyntaxError as e:
+        # Test code itself is invalid
+        return ValidationResult(
+            passed=False,
+            error=f"Test code syntax error: {e.msg}",
+        )
     
     # Execution namespace with output available
-    exec_globals = {"__builtins__": safe_builtins}
+    # Fresh globals per call: `global` statements in test_code must not leak
+    exec_globals = {"__builtins__": _SAFE_BUILTINS}
     exec_locals = {"output": output}
     
     try:
         # Execute the test code
-        exec(test_code, exec_globals, exec_locals)
+        exec(code, exec_globals, exec_locals)
         return ValidationResult(passed=True)
     
     except AssertionError as e:
@@ -250,6 +412,17 @@ def validate_test_exec(output: str, test_code: str) -> ValidationResult:
         )
 
 
+# Instruct model: best at following the strict YES/NO format
+JUDGE_MODEL = ModelName.KIMI_K2_INSTRUCT
+
+_JUDGE_SYSTEM_PROMPT = "You are a validation judge. You MUST respond with exactly YES or NO, nothing else."
+
+_BATCH_JUDGE_SYSTEM_PROMPT = (
+    "You are a validation judge. You MUST respond with one numbered YES or NO "
+    "line per output, nothing else."
+)
+
+
 async def validate_llm_judge(
     output: str,
     criteria: str,
@@ -307,49 +480,218 @@ OUTPUT TO EVALUATE:
 Does this output meet the criteria? 
 Respond with ONLY "YES" or "NO". Do not explain."""
 
-    system_prompt = "You are a validation judge. You MUST respond with exactly YES or NO, nothing else."
-    
     try:
         response = await llm_client.call(
-            model=ModelName.KIMI_K2_INSTRUCT,  # Use instruct model for following instructions
+            model=JUDGE_MODEL,
             prompt=judge_prompt,
-            system_prompt=system_prompt,
-        )
-        
-        # Parse response — look for YES or NO
-        # WHY uppercase + strip: Handle variations like "yes", "Yes.", " YES "
-        answer = response.content.strip().upper()
-        
-        # Check for YES
-        if answer == "YES" or answer.startswith("YES"):
-            return ValidationResult(passed=True)
-        
-        # Check for NO
-        if answer == "NO" or answer.startswith("NO"):
-            return ValidationResult(
-                passed=False,
-                error=f"LLM judge rejected output. Criteria: {criteria}",
-            )
-        
-        # Unexpected response — treat as failure
-        return ValidationResult(
-            passed=False,
-            error=f"LLM judge gave unclear response: '{response.content[:50]}'. Expected YES or NO.",
+            system_prompt=_JUDGE_SYSTEM_PROMPT,
         )
+        return _judge_verdict(response.content, criteria)
     
     except Exception as e:
         # LLM call failed
+        return _judge_error(e)
+
+
+def _judge_verdict(answer: str, criteria: str) -> ValidationResult:
+    """Turn one YES/NO answer from the judge into a ValidationResult."""
+    # Parse response — look for YES or NO
+    # WHY uppercase + strip: Handle variations like "yes", "Yes.", " YES "
+    normalized = answer.strip().upper()
+    
+    # Check for YES
+    if normalized == "YES" or normalized.startswith("YES"):
+        return ValidationResult(passed=True)
+    
+    # Check for NO
+    if normalized == "NO" or normalized.startswith("NO"):
         return ValidationResult(
             passed=False,
-            error=f"LLM judge error: {type(e).__name__}: {e}",
+            error=f"LLM judge rejected output. Criteria: {criteria}",
+        )
+    
+    # Unexpected response — treat as failure
+    return ValidationResult(
+        passed=False,
+        error=f"LLM judge gave unclear response: '{answer[:50]}'. Expected YES or NO.",
+    )
+
+
+def _judge_error(e: Exception) -> ValidationResult:
+    return ValidationResult(
+        passed=False,
+        error=f"LLM judge error: {type(e).__name__}: {e}",
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# JUDGE BATCHING — opt-in via ValidatorDispatcher(batch_judges=True)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# How long the first judge request waits for others to join its batch (seconds)
+JUDGE_BATCH_WINDOW = 0.01
+
+# Most outputs judged by one LLM call
+JUDGE_BATCH_SIZE = 8
+
+# "3: YES", "3. no", "3) Yes." ...
+_BATCH_ANSWER_RE = re.compile(r"^\s*(\d+)\s*[.:)\-]?\s*(YES|NO)\b", re.IGNORECASE | re.MULTILINE)
+
+
+class _JudgeBatcher:
+    """
+    Coalesces LLM_JUDGE requests that arrive within JUDGE_BATCH_WINDOW into
+    numbered prompts of up to JUDGE_BATCH_SIZE outputs, one LLM call each.
+    
+    WHY: Concurrent steps (parallel_steps, DAGs, run_many) and a step's
+    gathered judge rules each wait on their own round trip. One call per
+    batch turns N round trips into ceil(N / JUDGE_BATCH_SIZE).
+    
+    WHY opt-in: The judge sees several outputs in one prompt, which can sway
+    its verdicts; a batched answer that can't be parsed is retried one
+    request at a time, so batching never costs a verdict.
+    
+    Requests are grouped by llm_client so each batch goes through the client
+    that would have judged it alone.
+    """
+    
+    def __init__(
+        self,
+        window: float = JUDGE_BATCH_WINDOW,
+        max_batch: int = JUDGE_BATCH_SIZE,
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        # id(llm_client) -> (client, [(output, criteria, future), ...])
+        self._pending: dict[int, tuple[LLMClient, list[tuple[str, str, asyncio.Future]]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    async def judge(self, output: str, criteria: str, llm_client: LLMClient) -> ValidationResult:
+        future = asyncio.get_running_loop().create_future()
+        _, items = self._pending.setdefault(id(llm_client), (llm_client, []))
+        items.append((output, criteria, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        return await future
+    
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window)
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+        
+        batches = [
+            (client, items[i:i + self.max_batch])
+            for client, items in pending.values()
+            for i in range(0, len(items), self.max_batch)
+        ]
+        await asyncio.gather(*(self._judge_batch(client, batch) for client, batch in batches))
+    
+    async def _judge_batch(
+        self,
+        llm_client: LLMClient,
+        batch: list[tuple[str, str, asyncio.Future]],
+    ) -> None:
+        if len(batch) == 1:
+            output, criteria, future = batch[0]
+            results = [await validate_llm_judge(output, criteria, llm_client)]
+        else:
+            results = await self._call_batched(llm_client, batch)
+        
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():  # The waiting validation may have been cancelled
+                future.set_result(result)
+    
+    async def _call_batched(
+        self,
+        llm_client: LLMClient,
+        batch: list[tuple[str, str, asyncio.Future]],
+    ) -> list[ValidationResult]:
+        sections = "\n\n".join(
+            f"### {n}\nCRITERIA: {criteria}\n\nOUTPUT TO EVALUATE:\n{output}"
+            for n, (output, criteria, _) in enumerate(batch, start=1)
         )
+        prompt = f"""You are a strict validator. For each of the {len(batch)} outputs below, evaluate if it meets its own criteria.
+
+{sections}
+
+Reply with exactly {len(batch)} lines, one per output in order, each "<number>: YES" or "<number>: NO". Do not explain."""
+        
+        try:
+            response = await llm_client.call(
+                model=JUDGE_MODEL,
+                prompt=prompt,
+                system_prompt=_BATCH_JUDGE_SYSTEM_PROMPT,
+            )
+        except Exception as e:
+            return [_judge_error(e)] * len(batch)
+        
+        answers: dict[int, str] = {}
+        for match in _BATCH_ANSWER_RE.finditer(response.content):
+            answers.setdefault(int(match.group(1)), match.group(2))
+        
+        results: list[Optional[ValidationResult]] = [
+            _judge_verdict(answers[n], criteria) if n in answers else None
+            for n, (_, criteria, _) in enumerate(batch, start=1)
+        ]
+        
+        # Anything the batched answer didn't cover is judged on its own
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            retried = await asyncio.gather(
+                *(validate_llm_judge(batch[i][0], batch[i][1], llm_client) for i in missing)
+            )
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
 
 
 # =============================================================================
 # VALIDATOR DISPATCHER — Implements the Validator protocol
 # =============================================================================
 
+# Validators that run without an LLM: (output, rule) -> ValidationResult
+_SYNC_DISPATCH: dict[ValidationType, Callable[[str, ValidationRule], ValidationResult]] = {
+    ValidationType.PYTHON_SYNTAX: lambda output, rule: validate_python_syntax(output),
+    ValidationType.JSON_VALID: lambda output, rule: validate_json(output),
+    ValidationType.CONTAINS: lambda output, rule: validate_contains(output, rule.expected),
+    ValidationType.REGEX_MATCH: lambda output, rule: validate_regex_match(output, rule.pattern),
+    ValidationType.TEST_EXEC: lambda output, rule: validate_test_exec(output, rule.test_code),
+}
+
+
+# Outputs longer than this are searched off the event loop (RE2 only, see below)
+OFFLOAD_OUTPUT_CHARS = 64 * 1024
+
+# RE2 searches over outputs longer than OFFLOAD_OUTPUT_CHARS run here.
+# WHY only RE2: it releases the GIL while matching, so the event loop keeps
+# serving other runs during a long search. ast.parse, json/simdjson and re
+# hold the GIL for the whole call (measured: the loop doesn't tick even
+# with them in a thread), so offloading those would only add a hand-off.
+# Threads start on first use.
+_OFFLOAD_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="validator")
+
+
+def _should_offload(output: str, rule: ValidationRule) -> bool:
+    if len(output) <= OFFLOAD_OUTPUT_CHARS or rule.type is not ValidationType.REGEX_MATCH:
+        return False
+    if rule.pattern is None:
+        return False
+    try:
+        return releases_gil(compile_pattern(rule.pattern))
+    except re.error:
+        return False  # validate_regex_match reports it
+
+
 class ValidatorDispatcher:
+    """
+    Args:
+        batch_judges: Coalesce concurrent LLM_JUDGE calls into batched
+            prompts (see _JudgeBatcher)
+    """
+    
+    def __init__(self, batch_judges: bool = False):
+        self._judge_batcher = _JudgeBatcher() if batch_judges else None
+    
     async def validate(
         self,
         output: str,
@@ -358,31 +700,77 @@ class ValidatorDispatcher:
     ) -> ValidationResult:
         # ─────────────────────────────────────────────────────────────────
         # DISPATCH based on rule.type
-        # WHY match statement: Clear, exhaustive, Pythonic (3.10+)
+        # WHY a table: One dict lookup instead of testing each case in turn;
+        # only LLM_JUDGE needs to await anything.
         # ─────────────────────────────────────────────────────────────────
         
-        match rule.type:
-            case ValidationType.PYTHON_SYNTAX:
-                return validate_python_syntax(output)
-            
-            case ValidationType.JSON_VALID:
-                return validate_json(output)
-            
-            case ValidationType.CONTAINS:
-                return validate_contains(output, rule.expected)
-            
-            case ValidationType.REGEX_MATCH:
-                return validate_regex_match(output, rule.pattern)
-            
-            case ValidationType.TEST_EXEC:
-                return validate_test_exec(output, rule.test_code)
-            
-            case ValidationType.LLM_JUDGE:
-                return await validate_llm_judge(output, rule.criteria, llm_client)
-            
-            case _:
-                # Unknown validation type — should never happen if enum is used
-                return ValidationResult(
-                    passed=False,
-                    error=f"Unknown validation type: {rule.type}",
-                )
+        if rule.type is ValidationType.LLM_JUDGE:
+            if self._judge_batcher is not None and rule.criteria is not None and llm_client is not None:
+                return await self._judge_batcher.judge(output, rule.criteria, llm_client)
+            return await validate_llm_judge(output, rule.criteria, llm_client)
+        
+        if _should_offload(output, rule):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_OFFLOAD_POOL, self.validate_sync, output, rule)
+        return self.validate_sync(output, rule)
+    
+    async def validate_many(
+        self,
+        output: str,
+        rules: Sequence[ValidationRule],
+        llm_client: Optional[LLMClient] = None,
+    ) -> list[Optional[ValidationResult]]:
+        """
+        Validate one output against several rules; one entry per rule, in order.
+        
+        Local rules run in the given order and stop at the first failure; all
+        CONTAINS rules are checked together up front (validate_contains_many).
+        LLM_JUDGE rules run concurrently, and only if every local rule passed,
+        so a cheap failure never pays for a judge call. A rule that didn't
+        run because of an earlier failure gets None.
+        
+        WHY not a thread pool for every local rule: ast.parse, json, re and
+        exec hold the GIL throughout, so threads would add hand-off cost
+        without running them in parallel. Only long RE2 searches are
+        offloaded (see _should_offload).
+        """
+        results: list[Optional[ValidationResult]] = [None] * len(rules)
+        contains = [i for i, rule in enumerate(rules) if rule.type is ValidationType.CONTAINS]
+        judges = [i for i, rule in enumerate(rules) if rule.type is ValidationType.LLM_JUDGE]
+        
+        found = dict(zip(contains, validate_contains_many(output, [rules[i].expected for i in contains])))
+        for i, rule in enumerate(rules):
+            if rule.type is ValidationType.LLM_JUDGE:
+                continue
+            if i in found:
+                result = found[i]
+            elif _should_offload(output, rule):
+                result = await self.validate(output, rule)
+            else:
+                result = self.validate_sync(output, rule)
+            results[i] = result
+            if not result.passed:
+                return results
+        
+        judged = await asyncio.gather(*(self.validate(output, rules[i], llm_client) for i in judges))
+        for i, result in zip(judges, judged):
+            results[i] = result
+        return results
+    
+    def validate_sync(self, output: str, rule: ValidationRule) -> ValidationResult:
+        """
+        Run a rule that needs no LLM, without creating a coroutine.
+        
+        Raises:
+            ValueError: rule.type is LLM_JUDGE (use validate)
+        """
+        handler = _SYNC_DISPATCH.get(rule.type)
+        if handler is None:
+            if rule.type is ValidationType.LLM_JUDGE:
+                raise ValueError("LLM_JUDGE rules must go through validate()")
+            # Unknown validation type — should never happen if enum is used
+            return ValidationResult(
+                passed=False,
+                error=f"Unknown validation type: {rule.type}",
+            )
+        return handler(output, rule)
@@ -1,9 +1,29 @@
 import React from 'react';
 import { render, screen } from '@testing-library/react';
-import App from './App';
+import App, { appendEvent } from './App';
+import { ExecutionEvent } from './types';
 
 test('renders learn react link', () => {
   render(<App />);
   const linkElement = screen.getByText(/learn react/i);
   expect(linkElement).toBeInTheDocument();
 });
+
+test('merges consecutive llm_chunk events of the same step attempt', () => {
+  const chunk = (delta: string, attempt = 1): ExecutionEvent => ({
+    event: 'llm_chunk',
+    run_id: 'r',
+    step_id: 's',
+    attempt,
+    timestamp: '',
+    payload: { delta },
+  });
+  let log: ExecutionEvent[] = [];
+  log = appendEvent(log, chunk('Hel'));
+  log = appendEvent(log, chunk('lo'));
+  expect(log).toHaveLength(1);
+  expect(log[0].payload.delta).toBe('Hello');
+
+  log = appendEvent(log, chunk('x', 2));
+  expect(log).toHaveLength(2);
+});
@@ -71,6 +71,29 @@ function createEmptyWorkflow(): DraftWorkflow {
   };
 }
 
+/**
+ * Append an event to the log, merging consecutive llm_chunk events of the
+ * same step attempt into one row.
+ * WHY: streamed output arrives as a chunk every ~16ms; one row (and one
+ * array copy) per chunk would flood the log and grow quadratically.
+ */
+export function appendEvent(prev: ExecutionEvent[], event: ExecutionEvent): ExecutionEvent[] {
+  const last = prev[prev.length - 1];
+  if (
+    event.event === 'llm_chunk' &&
+    last?.event === 'llm_chunk' &&
+    last.step_id === event.step_id &&
+    last.attempt === event.attempt
+  ) {
+    const merged: ExecutionEvent = {
+      ...last,
+      payload: { delta: `${last.payload.delta ?? ''}${event.payload.delta ?? ''}` },
+    };
+    return [...prev.slice(0, -1), merged];
+  }
+  return [...prev, event];
+}
+
 // ============================================================================
 // Main App Component
 // ============================================================================
@@ -270,12 +293,12 @@ function App() {
       // Connect WebSocket for live events
       const ws = createEventSocket(response.run_id, {
         onEvent: (event) => {
-          setEvents(prev => [...prev, event]);
+          setEvents(prev => appendEvent(prev, event));
           
           // Update status based on event type
-          if (event.event_type === 'run_completed') {
+          if (event.event === 'run_completed') {
             setRunStatus('completed');
-          } else if (event.event_type === 'run_failed') {
+          } else if (event.event === 'run_failed') {
             setRunStatus('failed');
           }
         },
@@ -706,8 +729,8 @@ function ExecutionViewer({ events }: ExecutionViewerProps) {
     <div className="event-log" ref={logRef}>
       {events.map((event, idx) => (
         <div key={idx} className="event-item">
-          <span className={`event-type ${event.event_type}`}>
-            {event.event_type}
+          <span className={`event-type ${event.event}`}>
+            {event.event}
           </span>
           <span className="event-payload">
             {formatPayload(event.payload)}
@@ -113,8 +113,13 @@ export function createEventSocket(
 
   ws.onmessage = (event) => {
     try {
-      const data = JSON.parse(event.data) as ExecutionEvent;
-      options.onEvent(data);
+      // Events buffered before connecting arrive together as one JSON array
+      const data = JSON.parse(event.data) as ExecutionEvent | ExecutionEvent[];
+      if (Array.isArray(data)) {
+        data.forEach(options.onEvent);
+      } else {
+        options.onEvent(data);
+      }
     } catch (e) {
       console.error('Failed to parse WebSocket message:', e);
     }
@@ -57,6 +57,7 @@ export interface Step {
   system_prompt?: string;
   validations: ValidationRule[];  // Backend uses "validations", not "validation_rules"
   max_retries: number;
+  depends_on?: string[] | null;   // Step ids; omitted = previous step by order
 }
 
 // Complete workflow definition
@@ -85,7 +86,7 @@ export interface CreateWorkflowRequest {
 
 // Execution event from WebSocket
 export interface ExecutionEvent {
-  event_type: EventType;
+  event: EventType;
   run_id: string;
   step_id?: string;
   attempt?: number;
@@ -1,10 +1,10 @@
 import asyncio
-import json
 import os
 from pathlib import Path
 from typing import Any
 
 import httpx
+import orjson
 
 try:
     from dotenv import load_dotenv
@@ -25,40 +25,51 @@ def _body() -> dict[str, Any]:
     }
 
 
-async def probe(http2: bool) -> int:
+def _headers() -> dict[str, str]:
     api_key = os.getenv("UNBOUND_API_KEY")
     print(f"UNBOUND_API_KEY set? {bool(api_key)}")
-    headers = {
+    return {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
         "User-Agent": "unbound-workflow-builder/0.1",
     }
 
-    timeout = httpx.Timeout(10.0, connect=10.0, read=10.0, write=10.0)
 
+async def probe(client: httpx.AsyncClient, http2: bool, headers: dict[str, str], body: bytes) -> int:
     try:
-        async with httpx.AsyncClient(timeout=timeout, http2=http2, follow_redirects=True) as client:
-            r = await client.post(UNBOUND_API_URL, headers=headers, json=_body())
-            # Force reading body to catch read errors
-            content = r.content
-            print(f"http2={http2} status={r.status_code} bytes={len(content)}")
-            print(content[:200])
-            # Try json parse (may fail)
-            try:
-                data = r.json()
-                print("json_keys=", list(data.keys()))
-            except Exception as e:
-                print("json_parse_error=", type(e).__name__, repr(e))
-            return 0
+        r = await client.post(UNBOUND_API_URL, headers=headers, content=body)
+        # Force reading body to catch read errors
+        content = r.content
+        print(f"http2={http2} status={r.status_code} version={r.http_version} bytes={len(content)}")
+        print(content[:200])
+        # Try json parse (may fail)
+        try:
+            data = r.json()
+            print("json_keys=", list(data.keys()))
+        except Exception as e:
+            print("json_parse_error=", type(e).__name__, repr(e))
+        return 0
     except Exception as e:
         print(f"http2={http2} error=", type(e).__name__, repr(e))
         return 2
 
 
 async def main() -> int:
-    rc1 = await probe(http2=False)
-    rc2 = await probe(http2=True)
-    return rc1 or rc2
+    headers = _headers()  # Includes Content-Type: application/json
+    # Same body for every request: encode it once
+    body = orjson.dumps(_body())
+    timeout = httpx.Timeout(10.0, connect=10.0, read=10.0, write=10.0)
+    limits = httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60.0)
+
+    rc = 0
+    # One pooled client per protocol; the second probe on each reuses its connection
+    for http2 in (False, True):
+        async with httpx.AsyncClient(
+            timeout=timeout, http2=http2, limits=limits, follow_redirects=True
+        ) as client:
+            for _ in range(2):
+                rc = await probe(client, http2, headers, body) or rc
+    return rc
 
 
 if __name__ == "__main__":
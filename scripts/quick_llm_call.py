@@ -6,7 +6,13 @@ import sys
 BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
 sys.path.insert(0, str(BACKEND_DIR))
 
-from app.llm_client import UNBOUND_API_KEY_ENV, UNBOUND_API_URL, UnboundAPIError, UnboundLLMClient
+from app.llm_client import (
+    UNBOUND_API_KEY_ENV,
+    UNBOUND_API_URL,
+    UnboundAPIError,
+    UnboundLLMClient,
+    close_client,
+)
 from app.models import ModelName
 
 
@@ -36,6 +42,9 @@ async def main() -> int:
     except Exception as e:
         print("Unexpected error:", type(e).__name__, repr(e))
         return 3
+    finally:
+        # The client uses the process-wide pool (HTTP/2, keep-alive); close it before the loop ends
+        await close_client()
 
 
 if __name__ == "__main__":